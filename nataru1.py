@@ -13,13 +13,30 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
-import numpy as np
 import os
-import glob
-from datetime import datetime
 import warnings
-import base64
-from io import BytesIO
+import threading
+from collections import OrderedDict
+import plotly.io as pio
+from qos_data import (
+    ALLOWED_OPERATORS, DATA_FOLDER, get_data_files, get_file_info,
+    get_cache_key, load_multiple_files, load_prepared_frame, purge_data_cache,
+    dimension_memory_report, hash_upload, load_uploaded_frame, load_file_summary,
+    EXPORT_FORMATS, export_frame
+)
+from qos_analytics import (
+    TECH_COLUMNS, TECH_RATES, METRIC_REGISTRY, REGISTRY_TECHS, registry_columns, scored_columns, higher_is_better,
+    evaluate_cube, get_score_badge, cube_means, rate_count_columns, rate_table, RECORDS_COLUMN, LOCATIONS_COLUMN, categorize_quality,
+    get_score_badge_array, location_scores, score_rows,
+    rollup_cube, apply_filters, FILE_SUMMARY, build_file_summary, merge_file_summaries,
+    COMPARISON_METRICS, PERIOD_COLUMN, period_windows, order_periods, compare_periods, period_deltas,
+    cube_summary, summary_stat, filter_signature, conclusion_stats,
+    QUALITY_LABELS, quality_distribution, sketch_quantiles,
+    OVERALL_OPERATOR, operator_metric_stats,
+    build_filter_index, filter_positions, filter_options, take_rows, sorted_positions, search_positions,
+    generate_overall_conclusion_2g, generate_overall_conclusion_4g,
+    generate_per_operator_conclusion_2g, generate_per_operator_conclusion_4g
+)
 warnings.filterwarnings('ignore')
 
 # ===== CONFIGURATION =====
@@ -191,332 +208,264 @@ st.markdown("""
         0%, 100% { opacity: 1; }
         50% { opacity: 0.7; }
     }
-    
-    .download-btn {
-        background: linear-gradient(135deg, #667eea, #764ba2);
-        color: white;
-        padding: 0.8rem 2rem;
-        border-radius: 25px;
-        text-align: center;
-        font-weight: bold;
-        text-decoration: none;
-        display: inline-block;
-        margin: 0.5rem;
-        box-shadow: 0 4px 15px rgba(0,0,0,0.2);
-        transition: all 0.3s ease;
-    }
-    
-    .download-btn:hover {
-        transform: translateY(-3px);
-        box-shadow: 0 6px 20px rgba(0,0,0,0.3);
-    }
     </style>
 """, unsafe_allow_html=True)
 
 # ===== CONSTANTS =====
-ALLOWED_OPERATORS = ['Indosat', 'Telkomsel', 'XL']
 OPERATOR_COLORS = {'Indosat': '#FFD700', 'Telkomsel': '#DC143C', 'XL': '#4169E1'}
-DATA_FOLDER = 'data'
+QUALITY_COLORS = {'Excellent': '#2ecc71', 'Good': '#3498db', 'Fair': '#f39c12', 'Poor': '#e74c3c'}
 
-# 2G Thresholds
-THRESHOLDS_2G = {
-    'RxLev': {'excellent': -75, 'good': -85, 'fair': -95},
-    'RxQual': {'excellent': 2, 'good': 4, 'fair': 5}
-}
+# Registry technologies without a dedicated dashboard get the generic one
+REGISTRY_VIEWS = {f"📊 {tech} Analysis": tech for tech in REGISTRY_TECHS if tech not in TECH_COLUMNS}
 
-# 4G Thresholds
-THRESHOLDS_4G = {
-    'RSRP': {'excellent': -80, 'good': -90, 'fair': -100},
-    'Speed': {'excellent': 30, 'good': 15, 'fair': 5},
-    'Percentage': {'excellent': 95, 'good': 85, 'fair': 70}
+# Dashboard views and the metric columns each one reads
+DASHBOARD_VIEWS = ["📶 2G Analysis", "📡 4G Analysis", "📋 Kesimpulan 2G", "📋 Kesimpulan 4G"] + list(REGISTRY_VIEWS) + ["📈 Perbandingan Periode"]
+TECH_VIEW_COLUMNS = {
+    tech: tuple(dict.fromkeys(registry_columns(tech) + TECH_RATES.get(tech, ())
+                              + tuple(rate_count_columns(TECH_RATES.get(tech, ())))))
+    for tech in REGISTRY_TECHS
 }
+VIEW_COLUMNS = {
+    "📶 2G Analysis": TECH_VIEW_COLUMNS['2G'],
+    "📡 4G Analysis": TECH_VIEW_COLUMNS['4G'],
+    "📋 Kesimpulan 2G": TECH_COLUMNS['2G'],
+    "📋 Kesimpulan 4G": TECH_COLUMNS['4G'],
+    **{view: TECH_VIEW_COLUMNS[tech] for view, tech in REGISTRY_VIEWS.items()},
+    # Periods come from per-file summaries; the loaded frame only feeds the filters
+    "📈 Perbandingan Periode": TECH_COLUMNS['2G']
+}
+PERIOD_MODES = {"📁 Per File": None, "📅 Per Minggu": 'W', "🗓️ Per Bulan": 'M'}
+RATE_MODES = ["Row Average", "Sample-Weighted"]
+FIGURE_CACHE_SIZE = 64
+EXPORT_LABELS = {'xlsx': "Excel", 'csv': "CSV", 'parquet': "Parquet"}
+EXPORT_COLUMNS = {
+    '2G': ['Operator', 'Lokasi Pengukuran', 'Tanggal_Only', 'Average RxLev (2G)', 'Average RxQual (2G)'],
+    '4G': ['Operator', 'Lokasi Pengukuran', 'Tanggal_Only', 'Average RSRP (Signal Strenght 4G)',
+           'Average Speed Test DL (Mbps) (4G)', 'Youtube SR (%)']
+}
+TABLE_PAGE_SIZES = [25, 50, 100, 250]
 
-# ===== FILE MANAGEMENT =====
-def get_data_files(folder='data'):
-    if not os.path.exists(folder):
-        try:
-            os.makedirs(folder)
-        except:
-            pass
-        return []
-    files = []
-    for ext in ['*.xlsx', '*.xls', '*.csv']:
-        files.extend(glob.glob(os.path.join(folder, ext)))
-    files.sort(key=lambda x: os.path.getmtime(x), reverse=True)
-    return files
-
-def get_file_info(filepath):
-    try:
-        stat = os.stat(filepath)
-        return {
-            'name': os.path.basename(filepath),
-            'size': f"{stat.st_size / (1024 * 1024):.2f} MB",
-            'modified': datetime.fromtimestamp(stat.st_mtime).strftime('%Y-%m-%d %H:%M:%S')
-        }
-    except:
-        return None
+# Location charts with more groups than this switch to a level-of-detail mode
+CHART_LOCATION_LIMIT = 30
+CHART_DETAIL_MODES = ["Top N", "Bottom N", "Halaman", "Per Kabupaten"]
 
 # ===== DATA LOADING =====
-def identify_numeric_columns(df):
-    keywords = ['Average', 'Median', 'Max', 'Min', 'Success', 'SR', '(%)', 
-                'Speed', 'Mbps', 'RSRP', 'RSRQ', 'SINR', 'Latency', 'RTT',
-                'YouTube', 'Youtube', 'Quality', 'MOS', 'CST', 'Sample',
-                'TTFP', 'Visual', 'Freezing', 'Jerkiness', 'Browsing', 'Ping',
-                'Packet', 'Loss', 'Lat', 'Long', 'RxLev', 'RxQual', '2G']
-    skip = ['No.', 'Zona', 'Kabupaten / Kota', 'Lokasi Pengukuran',
-            'Tanggal Pengukuran', 'Operator', 'Category', 'Jenis Tes']
-    numeric_cols = []
-    for col in df.columns:
-        if str(col) in skip:
-            continue
-        for kw in keywords:
-            if kw in str(col):
-                numeric_cols.append(col)
-                break
-    return numeric_cols
+@st.cache_data(show_spinner=False)
+def load_and_prepare_data(file_path, cache_key=None, columns=None):
+    return load_prepared_frame(file_path, cache_key, columns, summary=FILE_SUMMARY)
 
-def convert_to_numeric_safe(df, columns):
-    df_copy = df.copy()
-    for col in columns:
-        if col in df_copy.columns:
-            try:
-                df_copy[col] = df_copy[col].replace({
-                    'No Data': np.nan, 'no data': np.nan,
-                    'N/A': np.nan, 'n/a': np.nan,
-                    '-': np.nan, '': np.nan, ' ': np.nan
-                })
-                df_copy[col] = pd.to_numeric(df_copy[col], errors='coerce')
-            except:
-                df_copy[col] = np.nan
-    return df_copy
+@st.cache_data(show_spinner=False)
+def load_uploaded_data(_uploaded, cache_key, columns=None):
+    """Load an upload keyed by its content hash; the file object itself is not hashed"""
+    return load_uploaded_frame(_uploaded, cache_key, columns)
+
+def get_upload_cache_key(uploaded):
+    """Content-hash cache key for an upload, computed once per session"""
+    upload_keys = st.session_state.setdefault('upload_cache_keys', {})
+    upload_id = getattr(uploaded, 'file_id', None) or (uploaded.name, uploaded.size)
+    if upload_id not in upload_keys:
+        upload_keys[upload_id] = hash_upload(uploaded)
+    return upload_keys[upload_id]
 
 @st.cache_data(show_spinner=False)
-def load_and_prepare_data(file_path):
-    try:
-        if isinstance(file_path, str):
-            file_ext = file_path.split('.')[-1].lower()
-        else:
-            file_ext = file_path.name.split('.')[-1].lower()
-        
-        if file_ext == 'xlsx':
-            try:
-                df = pd.read_excel(file_path, sheet_name='Compile_Summary', engine='openpyxl')
-            except:
-                df = pd.read_excel(file_path, sheet_name=0, engine='openpyxl')
-        elif file_ext == 'xls':
-            try:
-                df = pd.read_excel(file_path, sheet_name='Compile_Summary', engine='xlrd')
-            except:
-                df = pd.read_excel(file_path, sheet_name=0, engine='xlrd')
-        elif file_ext == 'csv':
-            df = pd.read_csv(file_path, encoding='utf-8-sig')
-        else:
-            return None, f"Format tidak didukung: {file_ext}"
-        
-        required = ['Operator', 'Kabupaten / Kota', 'Lokasi Pengukuran']
-        missing = [c for c in required if c not in df.columns]
-        if missing:
-            return None, f"Kolom tidak ada: {', '.join(missing)}"
-        
-        df = df[df['Operator'].isin(ALLOWED_OPERATORS)].copy()
-        if len(df) == 0:
-            return None, "Tidak ada data untuk Indosat, Telkomsel, XL"
-        
-        df = df.dropna(subset=['Operator', 'Kabupaten / Kota'])
-        
-        if 'Tanggal Pengukuran' in df.columns:
-            df['Tanggal Pengukuran'] = pd.to_datetime(df['Tanggal Pengukuran'], errors='coerce')
-            df['Tanggal_Only'] = df['Tanggal Pengukuran'].dt.date
-        
-        numeric_cols = identify_numeric_columns(df)
-        df = convert_to_numeric_safe(df, numeric_cols)
-        
-        if 'Lat' in df.columns:
-            df['Lat'] = pd.to_numeric(df['Lat'], errors='coerce')
-        if 'Long' in df.columns:
-            df['Long'] = pd.to_numeric(df['Long'], errors='coerce')
-        
-        return df, None
-    except Exception as e:
-        return None, f"Error: {str(e)}"
+def get_memory_report(_df, dataset_key):
+    """Categorical memory savings, computed once per loaded dataset"""
+    return dimension_memory_report(_df)
 
-# ===== HELPER FUNCTIONS =====
-def safe_agg(series, func='mean'):
-    try:
-        if func == 'mean':
-            return series.mean() if series.notna().any() else np.nan
-        elif func == 'min':
-            return series.min() if series.notna().any() else np.nan
-        elif func == 'max':
-            return series.max() if series.notna().any() else np.nan
-        elif func == 'median':
-            return series.median() if series.notna().any() else np.nan
-        else:
-            return np.nan
-    except:
-        return np.nan
+@st.cache_data(show_spinner=False)
+def get_file_summary(file_path, cache_key):
+    """Persisted per-file metric cube and quantile sketches; the workbook is
+    parsed at most once ever"""
+    return load_file_summary(file_path, FILE_SUMMARY, cache_key)
 
-def categorize_quality(value, metric_type):
-    """Categorize signal quality based on value and type"""
-    if pd.isna(value):
-        return "No Data", "quality-poor"
-    
-    if metric_type == 'rxlev':
-        if value >= THRESHOLDS_2G['RxLev']['excellent']:
-            return "Excellent", "quality-excellent"
-        elif value >= THRESHOLDS_2G['RxLev']['good']:
-            return "Good", "quality-good"
-        elif value >= THRESHOLDS_2G['RxLev']['fair']:
-            return "Fair", "quality-fair"
-        else:
-            return "Poor", "quality-poor"
-    
-    elif metric_type == 'rxqual':
-        if value <= THRESHOLDS_2G['RxQual']['excellent']:
-            return "Excellent", "quality-excellent"
-        elif value <= THRESHOLDS_2G['RxQual']['good']:
-            return "Good", "quality-good"
-        elif value <= THRESHOLDS_2G['RxQual']['fair']:
-            return "Fair", "quality-fair"
-        else:
-            return "Poor", "quality-poor"
-    
-    elif metric_type == 'rsrp':
-        if value >= THRESHOLDS_4G['RSRP']['excellent']:
-            return "Excellent", "quality-excellent"
-        elif value >= THRESHOLDS_4G['RSRP']['good']:
-            return "Good", "quality-good"
-        elif value >= THRESHOLDS_4G['RSRP']['fair']:
-            return "Fair", "quality-fair"
-        else:
-            return "Poor", "quality-poor"
-    
-    elif metric_type == 'speed':
-        if value >= THRESHOLDS_4G['Speed']['excellent']:
-            return "Excellent", "quality-excellent"
-        elif value >= THRESHOLDS_4G['Speed']['good']:
-            return "Good", "quality-good"
-        elif value >= THRESHOLDS_4G['Speed']['fair']:
-            return "Fair", "quality-fair"
-        else:
-            return "Poor", "quality-poor"
-    
-    elif metric_type == 'percentage':
-        if value >= THRESHOLDS_4G['Percentage']['excellent']:
-            return "Excellent", "quality-excellent"
-        elif value >= THRESHOLDS_4G['Percentage']['good']:
-            return "Good", "quality-good"
-        elif value >= THRESHOLDS_4G['Percentage']['fair']:
-            return "Fair", "quality-fair"
-        else:
-            return "Poor", "quality-poor"
-    
-    return "Unknown", "quality-poor"
+@st.cache_data(show_spinner=False)
+def get_dataset_summary(_df, dataset_key, sources=()):
+    """Operator x Kabupaten x Lokasi x Tanggal cube and quantile sketches of the loaded dataset.
+    
+    File sources merge their persisted per-file summaries; the rows are only
+    aggregated again for uploads or when merging files dropped duplicate rows.
+    """
+    summaries = []
+    for file_path, cache_key in sources:
+        summary, error = get_file_summary(file_path, cache_key)
+        if error:
+            break
+        summaries.append(summary)
+    if sources and len(summaries) == len(sources):
+        summary = merge_file_summaries(*summaries) if len(summaries) > 1 else summaries[0]
+        if summary['cube'][RECORDS_COLUMN].sum() == len(_df):
+            return summary
+    return build_file_summary(_df)
 
-def calculate_2g_score(rxlev, rxqual):
-    """Calculate 2G performance score (0-100)"""
-    scores = []
-    
-    if pd.notna(rxlev):
-        if rxlev >= -75:
-            scores.append(100)
-        elif rxlev >= -85:
-            scores.append(75)
-        elif rxlev >= -95:
-            scores.append(50)
-        else:
-            scores.append(25)
-    
-    if pd.notna(rxqual):
-        if rxqual <= 2:
-            scores.append(100)
-        elif rxqual <= 4:
-            scores.append(75)
-        elif rxqual <= 5:
-            scores.append(50)
-        else:
-            scores.append(25)
-    
-    return np.mean(scores) if scores else 0
+@st.cache_data(show_spinner=False)
+def get_percentiles(_sketches_filtered, view_key, by):
+    """P10/Median/P90 per group and metric from the merged sketches"""
+    return sketch_quantiles(_sketches_filtered, by)
 
-def calculate_4g_score(rsrp, speed_dl, browsing_sr, youtube_sr):
-    """Calculate 4G performance score (0-100) with weights"""
-    score = 0
-    weights_used = 0
-    
-    # RSRP (30% weight)
-    if pd.notna(rsrp):
-        if rsrp >= -80:
-            score += 100 * 0.3
-        elif rsrp >= -90:
-            score += 75 * 0.3
-        elif rsrp >= -100:
-            score += 50 * 0.3
-        else:
-            score += 25 * 0.3
-        weights_used += 0.3
-    
-    # Download Speed (30% weight)
-    if pd.notna(speed_dl):
-        if speed_dl >= 30:
-            score += 100 * 0.3
-        elif speed_dl >= 15:
-            score += 75 * 0.3
-        elif speed_dl >= 5:
-            score += 50 * 0.3
-        else:
-            score += 25 * 0.3
-        weights_used += 0.3
-    
-    # Browsing SR (20% weight)
-    if pd.notna(browsing_sr):
-        if browsing_sr >= 95:
-            score += 100 * 0.2
-        elif browsing_sr >= 85:
-            score += 75 * 0.2
-        else:
-            score += 50 * 0.2
-        weights_used += 0.2
-    
-    # YouTube SR (20% weight)
-    if pd.notna(youtube_sr):
-        if youtube_sr >= 95:
-            score += 100 * 0.2
-        elif youtube_sr >= 85:
-            score += 75 * 0.2
+@st.cache_data(show_spinner=False)
+def get_filter_index(_df, dataset_key):
+    """Row positions and option lists per filter column, built once per loaded dataset"""
+    return build_filter_index(_df)
+
+@st.cache_data(show_spinner=False)
+def get_metric_summary(_cube_filtered, _sketches_filtered, view_key, by, tech):
+    """mean/min/max/approx. median/count of a technology's metrics per group, rolled up
+    from the metric cube once per filter state and shared by the charts and export tables"""
+    return cube_summary(_cube_filtered, _sketches_filtered, by, TECH_COLUMNS[tech])
+
+@st.cache_data(show_spinner=False)
+def get_quality_distribution(_df_filtered, view_key, tech):
+    """Band counts per operator and metric, computed once per filter state"""
+    return quality_distribution(_df_filtered, tech)
+
+@st.cache_data(show_spinner=False)
+def get_operator_stats(_df_filtered, _cube_filtered, _sketches_filtered, view_key, tech):
+    """Per-operator and overall stats + band counts of a technology's metrics,
+    one table per filter state shared by the overview tiles and operator cards"""
+    distribution = get_quality_distribution(_df_filtered, view_key, tech)
+    return operator_metric_stats(_cube_filtered, _sketches_filtered, distribution, TECH_COLUMNS[tech])
+
+@st.cache_data(show_spinner=False)
+def get_conclusion_stats(_cube_filtered, view_key, tech):
+    """(operator, location) stats table shared by every conclusion of a filter state"""
+    return conclusion_stats(_cube_filtered, TECH_COLUMNS[tech])
+
+@st.cache_data(show_spinner=False)
+def get_conclusion(_cube_filtered, view_key, tech, operators, operator=None):
+    """Rendered conclusion markdown, memoised per filter state, tech and operator"""
+    stats = get_conclusion_stats(_cube_filtered, view_key, tech)
+    if operator is None:
+        generate = generate_overall_conclusion_2g if tech == '2G' else generate_overall_conclusion_4g
+        return generate(None, list(operators), stats)
+    generate = generate_per_operator_conclusion_2g if tech == '2G' else generate_per_operator_conclusion_4g
+    return generate(None, operator, stats)
+
+@st.cache_data(show_spinner=False)
+def get_export_table(_df_filtered, view_key, tech):
+    """Per-row export table with scores, built once per filter state"""
+    columns = [c for c in EXPORT_COLUMNS[tech] if c in _df_filtered.columns]
+    return _df_filtered[columns].assign(**{f'Score {tech}': score_rows(_df_filtered, tech).round(1)})
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def get_sorted_positions(_df, view_key, name, col, ascending):
+    """Sort index of a table, computed once per filter state and sort order"""
+    return sorted_positions(_df, col, ascending)
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def get_table_positions(_df, view_key, name, col, ascending, search_col, query):
+    """Sorted positions narrowed by the column search"""
+    return search_positions(_df, get_sorted_positions(_df, view_key, name, col, ascending), search_col, query)
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def get_export(_df, view_key, name, file_format):
+    """Export file contents, produced on the first download per filter state and format"""
+    return export_frame(_df, file_format)
+
+@st.cache_data(show_spinner=False)
+def load_selected_files(file_paths, cache_keys, columns=None):
+    """Merge several data files (parsed in parallel) into one frame"""
+    return load_multiple_files(list(file_paths), list(cache_keys), columns=columns, summary=FILE_SUMMARY)
+
+# ===== VISUALIZATION FUNCTIONS =====
+@st.cache_resource(show_spinner=False)
+def get_figure_cache():
+    """Serialised figures shared by every rerun and session, least recently used evicted first"""
+    return {'figures': OrderedDict(), 'hits': 0, 'misses': 0, 'lock': threading.Lock()}
+
+def cached_figure(key, build):
+    """Figure for key from the shared cache; build() runs only on a miss"""
+    cache = get_figure_cache()
+    with cache['lock']:
+        payload = cache['figures'].get(key)
+        if payload is not None:
+            cache['figures'].move_to_end(key)
+            cache['hits'] += 1
         else:
-            score += 50 * 0.2
-        weights_used += 0.2
-    
-    # Normalize if not all metrics available
-    if weights_used > 0:
-        score = (score / weights_used) * 1.0
-    
-    return score
+            cache['misses'] += 1
+    if payload is not None:
+        return pio.from_json(payload) if payload else None
+    
+    fig = build()
+    with cache['lock']:
+        cache['figures'][key] = fig.to_json() if fig else ''
+        while len(cache['figures']) > FIGURE_CACHE_SIZE:
+            cache['figures'].popitem(last=False)
+    return fig
+
+def chart_detail_controls(n_locations):
+    """Sidebar level-of-detail setting (mode, n, page) for location charts,
+    None when every location fits on one chart"""
+    if n_locations <= CHART_LOCATION_LIMIT:
+        return None
+    st.markdown("**📊 Chart Detail**")
+    st.caption(f"{n_locations} lokasi > {CHART_LOCATION_LIMIT}: grafik lokasi diringkas")
+    mode = st.radio("Tampilkan:", CHART_DETAIL_MODES, key='chart_detail_mode', horizontal=True)
+    if mode == "Per Kabupaten":
+        return (mode, 0, 1)
+    n = st.slider("Jumlah lokasi", 5, CHART_LOCATION_LIMIT, 20, step=5, key='chart_detail_n')
+    page = 1
+    if mode == "Halaman":
+        pages = -(-n_locations // n)
+        page = st.selectbox("Halaman", list(range(1, pages + 1)), key='chart_detail_page',
+                            format_func=lambda p: f"{p} / {pages}")
+    return (mode, n, page)
 
-def get_score_badge(score):
-    """Get score badge class and label"""
-    if score >= 85:
-        return "quality-excellent", "Sangat Baik"
-    elif score >= 70:
-        return "quality-good", "Baik"
-    elif score >= 50:
-        return "quality-fair", "Cukup"
+def chart_data(location_means, cube_filtered, rate_mode, detail):
+    """Frame and x column for location charts: per location, or rolled up per
+    kabupaten from the cube in "Per Kabupaten" mode"""
+    if detail is None or detail[0] != "Per Kabupaten":
+        return location_means, 'Lokasi Pengukuran'
+    by = ('Kabupaten / Kota', 'Operator')
+    metrics = [col for col in location_means.columns if col not in ('Lokasi Pengukuran', 'Operator')]
+    return apply_rate_mode(cube_means(cube_filtered, by, metrics), cube_filtered, rate_mode, by), 'Kabupaten / Kota'
+
+def limit_chart_rows(plot_data, x_col, y_col, detail):
+    """Rows of the x groups kept by the level-of-detail setting, plus a title suffix.
+    
+    Top/Bottom N rank groups by their mean over operators, best first for the
+    metric's direction (lowest RxQual is Top); pages follow x order.
+    """
+    if detail is None:
+        return plot_data, ''
+    mode, n, page = detail
+    if mode == "Per Kabupaten":
+        return plot_data, ' - per Kabupaten'
+    group_means = plot_data.groupby(x_col, observed=True)[y_col].mean()
+    largest, smallest = group_means.nlargest, group_means.nsmallest
+    best, worst = (largest, smallest) if higher_is_better(y_col) else (smallest, largest)
+    if mode == "Top N":
+        keep, suffix = best(n).index, f" - Top {n}"
+    elif mode == "Bottom N":
+        keep, suffix = worst(n).index, f" - Bottom {n}"
     else:
-        return "quality-poor", "Perlu Perbaikan"
+        keep, suffix = group_means.index.sort_values()[(page - 1) * n:page * n], f" - Hal. {page}"
+    return plot_data[plot_data[x_col].isin(keep)], suffix
 
-# ===== VISUALIZATION FUNCTIONS =====
-def create_enhanced_chart(data, x_col, y_col, title, color_col='Operator', chart_type='signal'):
-    """Enhanced chart with animations and better styling"""
+def create_enhanced_chart(data, x_col, y_col, title, color_col='Operator', chart_type='signal', cache_key=None,
+                          detail=None):
+    """Enhanced chart with animations and better styling.
+    
+    With cache_key (the filter state the data was computed for) the figure
+    is served from the shared figure cache instead of being rebuilt. detail
+    is the level-of-detail setting from chart_detail_controls.
+    """
+    if cache_key is not None:
+        return cached_figure((cache_key, x_col, y_col, title, color_col, chart_type, detail),
+                             lambda: create_enhanced_chart(data, x_col, y_col, title, color_col, chart_type,
+                                                           detail=detail))
     try:
         if y_col not in data.columns:
             return None
         plot_data = data[[x_col, y_col, color_col]].dropna(subset=[y_col])
+        plot_data, suffix = limit_chart_rows(plot_data, x_col, y_col, detail)
         if plot_data.empty:
             return None
+        title = title + suffix
+        # Per-bar labels and outlines only while the bars stay readable
+        labelled = plot_data[x_col].nunique() <= CHART_LOCATION_LIMIT
         
         fig = px.bar(plot_data, x=x_col, y=y_col, color=color_col, barmode='group',
-                    title=title, color_discrete_map=OPERATOR_COLORS, text=y_col)
+                    title=title, color_discrete_map=OPERATOR_COLORS, text=y_col if labelled else None)
         
         if chart_type == 'signal':
             y_min = plot_data[y_col].min()
@@ -542,12 +491,13 @@ def create_enhanced_chart(data, x_col, y_col, title, color_col='Operator', chart
             font={'family': 'Arial, sans-serif'}
         )
         
-        fig.update_traces(
-            texttemplate='%{text:.1f}',
-            textposition='outside',
-            textfont={'size': 10, 'color': '#2c3e50'},
-            marker={'line': {'width': 1, 'color': '#2c3e50'}}
-        )
+        if labelled:
+            fig.update_traces(
+                texttemplate='%{text:.1f}',
+                textposition='outside',
+                textfont={'size': 10, 'color': '#2c3e50'},
+                marker={'line': {'width': 1, 'color': '#2c3e50'}}
+            )
         
         if chart_type == 'signal':
             fig.add_hline(y=0, line_dash="solid", line_color="#34495e", line_width=2,
@@ -557,31 +507,77 @@ def create_enhanced_chart(data, x_col, y_col, title, color_col='Operator', chart
     except:
         return None
 
-def download_dataframe_as_excel(df, filename):
-    """Create download link for Excel file"""
-    output = BytesIO()
-    with pd.ExcelWriter(output, engine='openpyxl') as writer:
-        df.to_excel(writer, index=False, sheet_name='Data')
-    excel_data = output.getvalue()
-    b64 = base64.b64encode(excel_data).decode()
-    href = f'<a href="data:application/vnd.openxmlformats-officedocument.spreadsheetml.sheet;base64,{b64}" download="{filename}" class="download-btn">📥 Download {filename}</a>'
-    return href
+def render_paged_table(df, view_key, name, sort_col='Lokasi Pengukuran', height=400):
+    """Table that sends only the visible page, with server-side sorting and column search"""
+    columns = list(df.columns)
+    col1, col2, col3, col4 = st.columns([2, 1, 2, 2])
+    with col1:
+        sort_col = st.selectbox("Urutkan:", columns, index=columns.index(sort_col) if sort_col in columns else 0,
+                                key=f'table_sort_{name}')
+    with col2:
+        ascending = st.radio("Arah:", ["▲", "▼"], key=f'table_order_{name}', horizontal=True) == "▲"
+    with col3:
+        search_col = st.selectbox("Cari di kolom:", columns, key=f'table_search_col_{name}')
+    with col4:
+        query = st.text_input("Cari:", key=f'table_search_{name}').strip()
+    
+    positions = get_table_positions(df, view_key, name, sort_col, ascending, search_col, query)
+    page_size = st.session_state.get(f'table_size_{name}', TABLE_PAGE_SIZES[0])
+    pages = max(1, -(-len(positions) // page_size))
+    if st.session_state.get(f'table_page_{name}', 1) > pages:
+        st.session_state[f'table_page_{name}'] = pages
+    
+    page = st.session_state.get(f'table_page_{name}', 1)
+    start = (page - 1) * page_size
+    st.dataframe(df.iloc[positions[start:start + page_size]], use_container_width=True, height=height)
+    
+    col1, col2, col3 = st.columns([1, 1, 2])
+    with col1:
+        st.number_input(f"Halaman (1-{pages})", min_value=1, max_value=pages, step=1, key=f'table_page_{name}')
+    with col2:
+        st.selectbox("Baris per halaman:", TABLE_PAGE_SIZES, key=f'table_size_{name}')
+    with col3:
+        st.caption(f"Baris {min(start + 1, len(positions)):,}-{min(start + page_size, len(positions)):,} "
+                   f"dari {len(positions):,} (total {len(df):,})")
+
+def render_export(df, view_key, name):
+    """Format picker and download button. The file is built only when the
+    button is clicked, then kept per filter state and format"""
+    col1, col2 = st.columns([2, 1])
+    with col1:
+        file_format = st.radio("Format:", list(EXPORT_FORMATS), format_func=EXPORT_LABELS.get,
+                               key=f'export_format_{name}', horizontal=True)
+    with col2:
+        st.download_button(f"📥 Download {name}.{file_format}",
+                           data=lambda: get_export(df, view_key, name, file_format),
+                           file_name=f"{name}.{file_format}", mime=EXPORT_FORMATS[file_format],
+                           key=f'export_{name}', on_click='ignore')
 
 # ===== ENHANCED 2G INFORMATION DISPLAY =====
-def render_2g_detailed_info(df_operator, operator_name):
-    """Render detailed 2G information with RxLev and RxQual explanations"""
+def render_distribution_metrics(counts):
+    """Excellent/Good/Fair/Poor tiles for one operator and metric"""
+    total = counts['Total']
+    col1, col2, col3, col4 = st.columns(4)
+    for col, icon, label in zip([col1, col2, col3, col4], ["🟢", "🔵", "🟡", "🔴"], QUALITY_LABELS):
+        col.metric(f"{icon} {label}", f"{counts[label]} ({counts[label]/total*100:.1f}%)")
+
+def render_2g_detailed_info(operator_name, op_stats):
+    """Render detailed 2G information with RxLev and RxQual explanations
+    
+    op_stats holds the operator's rows of get_operator_stats, indexed by Metric.
+    """
     st.markdown(f"<div class='operator-card'>", unsafe_allow_html=True)
     st.markdown(f"### 👤 **{operator_name}**")
     st.markdown("")
     
     # RxLev Analysis
-    if 'Average RxLev (2G)' in df_operator.columns:
+    if 'Average RxLev (2G)' in op_stats.index:
         st.markdown("#### 📶 **RxLev (Received Signal Level)**")
         
-        rxlev_avg = safe_agg(df_operator['Average RxLev (2G)'], 'mean')
-        rxlev_min = safe_agg(df_operator['Average RxLev (2G)'], 'min')
-        rxlev_max = safe_agg(df_operator['Average RxLev (2G)'], 'max')
-        rxlev_median = safe_agg(df_operator['Average RxLev (2G)'], 'median')
+        rxlev_avg = op_stats.loc['Average RxLev (2G)', 'mean']
+        rxlev_min = op_stats.loc['Average RxLev (2G)', 'min']
+        rxlev_max = op_stats.loc['Average RxLev (2G)', 'max']
+        rxlev_median, rxlev_p10, rxlev_p90 = op_stats.loc['Average RxLev (2G)', ['median', 'P10', 'P90']]
         
         col1, col2, col3, col4 = st.columns(4)
         
@@ -593,6 +589,8 @@ def render_2g_detailed_info(df_operator, operator_name):
         
         with col2:
             st.metric("📈 Median", f"{rxlev_median:.2f} dBm" if pd.notna(rxlev_median) else "N/A")
+            if pd.notna(rxlev_median):
+                st.caption(f"P10 {rxlev_p10:.2f} | P90 {rxlev_p90:.2f} dBm")
         
         with col3:
             st.metric("🔺 Maximum", f"{rxlev_max:.2f} dBm" if pd.notna(rxlev_max) else "N/A")
@@ -601,21 +599,9 @@ def render_2g_detailed_info(df_operator, operator_name):
             st.metric("🔻 Minimum", f"{rxlev_min:.2f} dBm" if pd.notna(rxlev_min) else "N/A")
         
         # RxLev Distribution
-        if pd.notna(rxlev_avg):
-            rxlev_data = df_operator['Average RxLev (2G)'].dropna()
-            if not rxlev_data.empty:
-                excellent = len(rxlev_data[rxlev_data >= -75])
-                good = len(rxlev_data[(rxlev_data >= -85) & (rxlev_data < -75)])
-                fair = len(rxlev_data[(rxlev_data >= -95) & (rxlev_data < -85)])
-                poor = len(rxlev_data[rxlev_data < -95])
-                total = len(rxlev_data)
-                
-                st.markdown("**📊 Signal Strength Distribution:**")
-                col1, col2, col3, col4 = st.columns(4)
-                col1.metric("🟢 Excellent", f"{excellent} ({excellent/total*100:.1f}%)")
-                col2.metric("🔵 Good", f"{good} ({good/total*100:.1f}%)")
-                col3.metric("🟡 Fair", f"{fair} ({fair/total*100:.1f}%)")
-                col4.metric("🔴 Poor", f"{poor} ({poor/total*100:.1f}%)")
+        if pd.notna(rxlev_avg) and op_stats.loc['Average RxLev (2G)', 'Total'] > 0:
+            st.markdown("**📊 Signal Strength Distribution:**")
+            render_distribution_metrics(op_stats.loc['Average RxLev (2G)'])
         
         st.markdown("""
         <div class='info-box'>
@@ -631,13 +617,13 @@ def render_2g_detailed_info(df_operator, operator_name):
     st.markdown("---")
     
     # RxQual Analysis
-    if 'Average RxQual (2G)' in df_operator.columns:
+    if 'Average RxQual (2G)' in op_stats.index:
         st.markdown("#### 📡 **RxQual (Received Signal Quality)**")
         
-        rxqual_avg = safe_agg(df_operator['Average RxQual (2G)'], 'mean')
-        rxqual_min = safe_agg(df_operator['Average RxQual (2G)'], 'min')
-        rxqual_max = safe_agg(df_operator['Average RxQual (2G)'], 'max')
-        rxqual_median = safe_agg(df_operator['Average RxQual (2G)'], 'median')
+        rxqual_avg = op_stats.loc['Average RxQual (2G)', 'mean']
+        rxqual_min = op_stats.loc['Average RxQual (2G)', 'min']
+        rxqual_max = op_stats.loc['Average RxQual (2G)', 'max']
+        rxqual_median, rxqual_p10, rxqual_p90 = op_stats.loc['Average RxQual (2G)', ['median', 'P10', 'P90']]
         
         col1, col2, col3, col4 = st.columns(4)
         
@@ -649,6 +635,8 @@ def render_2g_detailed_info(df_operator, operator_name):
         
         with col2:
             st.metric("📈 Median", f"{rxqual_median:.2f}" if pd.notna(rxqual_median) else "N/A")
+            if pd.notna(rxqual_median):
+                st.caption(f"P10 {rxqual_p10:.2f} | P90 {rxqual_p90:.2f}")
         
         with col3:
             st.metric("🔺 Maximum", f"{rxqual_max:.2f}" if pd.notna(rxqual_max) else "N/A")
@@ -657,21 +645,9 @@ def render_2g_detailed_info(df_operator, operator_name):
             st.metric("🔻 Minimum", f"{rxqual_min:.2f}" if pd.notna(rxqual_min) else "N/A")
         
         # RxQual Distribution
-        if pd.notna(rxqual_avg):
-            rxqual_data = df_operator['Average RxQual (2G)'].dropna()
-            if not rxqual_data.empty:
-                excellent = len(rxqual_data[rxqual_data <= 2])
-                good = len(rxqual_data[(rxqual_data > 2) & (rxqual_data <= 4)])
-                fair = len(rxqual_data[(rxqual_data > 4) & (rxqual_data <= 5)])
-                poor = len(rxqual_data[rxqual_data > 5])
-                total = len(rxqual_data)
-                
-                st.markdown("**📊 Signal Quality Distribution:**")
-                col1, col2, col3, col4 = st.columns(4)
-                col1.metric("🟢 Excellent", f"{excellent} ({excellent/total*100:.1f}%)")
-                col2.metric("🔵 Good", f"{good} ({good/total*100:.1f}%)")
-                col3.metric("🟡 Fair", f"{fair} ({fair/total*100:.1f}%)")
-                col4.metric("🔴 Poor", f"{poor} ({poor/total*100:.1f}%)")
+        if pd.notna(rxqual_avg) and op_stats.loc['Average RxQual (2G)', 'Total'] > 0:
+            st.markdown("**📊 Signal Quality Distribution:**")
+            render_distribution_metrics(op_stats.loc['Average RxQual (2G)'])
         
         st.markdown("""
         <div class='info-box'>
@@ -686,312 +662,62 @@ def render_2g_detailed_info(df_operator, operator_name):
     
     st.markdown("</div>", unsafe_allow_html=True)
 
-# ===== CONCLUSION GENERATORS =====
-def generate_overall_conclusion_2g(df_data, operators):
-    """Generate overall 2G conclusion for all operators"""
-    lines = []
-    lines.append("## 📊 **Kesimpulan Pengukuran 2G - Overall**")
-    lines.append("")
-    lines.append(f"**📅 Periode Analisis:** {df_data['Tanggal_Only'].min()} s/d {df_data['Tanggal_Only'].max()}")
-    lines.append(f"**📍 Total Lokasi:** {df_data['Lokasi Pengukuran'].nunique()} lokasi")
-    lines.append(f"**📊 Total Pengukuran:** {len(df_data)} records")
-    lines.append("")
-    lines.append("---")
-    
-    operator_scores = {}
-    operator_details = {}
-    
-    for operator in operators:
-        op_data = df_data[df_data['Operator'] == operator]
-        
-        rxlev = safe_agg(op_data['Average RxLev (2G)']) if 'Average RxLev (2G)' in op_data.columns else np.nan
-        rxqual = safe_agg(op_data['Average RxQual (2G)']) if 'Average RxQual (2G)' in op_data.columns else np.nan
-        
-        score = calculate_2g_score(rxlev, rxqual)
-        operator_scores[operator] = score
-        operator_details[operator] = {'rxlev': rxlev, 'rxqual': rxqual}
-        
-        lines.append("")
-        lines.append(f"### 👤 **{operator}**")
-        lines.append("")
-        
-        # Signal Metrics
-        if pd.notna(rxlev):
-            cat, cls = categorize_quality(rxlev, 'rxlev')
-            lines.append(f"**📶 RxLev (Signal Strength):** {rxlev:.2f} dBm - <span class='{cls}'>{cat}</span>")
-        
-        if pd.notna(rxqual):
-            cat, cls = categorize_quality(rxqual, 'rxqual')
-            lines.append(f"**📡 RxQual (Signal Quality):** {rxqual:.2f} - <span class='{cls}'>{cat}</span>")
-        
-        # Coverage Stats
-        lines.append(f"**📍 Coverage:** {op_data['Lokasi Pengukuran'].nunique()} locations, {len(op_data)} measurements")
-        
-        # Overall Score
-        badge_cls, badge_label = get_score_badge(score)
-        lines.append("")
-        lines.append(f"**📊 Overall Score:** <span class='{badge_cls} style='padding: 0.5rem 1rem;'>{badge_label} ({score:.0f}/100)</span>")
-        lines.append("")
-        lines.append("---")
-    
-    # Ranking
-    if operator_scores:
-        lines.append("")
-        lines.append("## 🏆 **Ranking 2G Performance**")
-        lines.append("")
-        
-        sorted_ops = sorted(operator_scores.items(), key=lambda x: x[1], reverse=True)
-        for rank, (op, score) in enumerate(sorted_ops, 1):
-            medal = "🥇" if rank == 1 else "🥈" if rank == 2 else "🥉"
-            badge = " <span class='best-badge'>TERBAIK 2G</span>" if rank == 1 else ""
-            details = operator_details[op]
-            
-            lines.append(f"{medal} **{rank}. {op}**{badge}")
-            lines.append(f"   - Overall Score: {score:.0f}/100")
-            lines.append(f"   - RxLev: {details['rxlev']:.2f} dBm | RxQual: {details['rxqual']:.2f}")
-            lines.append("")
-    
-    return "\n".join(lines)
+# ===== DASHBOARD SECTIONS =====
+def apply_rate_mode(location_means, cube_filtered, rate_mode, by=('Lokasi Pengukuran', 'Operator')):
+    """Swap row-averaged rates for sample-weighted ones when that mode is active"""
+    if rate_mode != "Sample-Weighted":
+        return location_means
+    rolled = rollup_cube(cube_filtered, by, metrics=[])
+    rates = [rate for rate in TECH_RATES['2G'] + TECH_RATES['4G']
+             if rate in location_means.columns and f"{rate} [weighted]" in rolled.columns]
+    weighted = rolled[list(by) + [f"{rate} [weighted]" for rate in rates]]
+    weighted = weighted.rename(columns={f"{rate} [weighted]": rate for rate in rates})
+    return location_means.drop(columns=rates).merge(weighted, on=list(by), how='left')
 
-def generate_overall_conclusion_4g(df_data, operators):
-    """Generate overall 4G conclusion for all operators"""
-    lines = []
-    lines.append("## 📊 **Kesimpulan Pengukuran 4G - Overall**")
-    lines.append("")
-    lines.append(f"**📅 Periode Analisis:** {df_data['Tanggal_Only'].min()} s/d {df_data['Tanggal_Only'].max()}")
-    lines.append(f"**📍 Total Lokasi:** {df_data['Lokasi Pengukuran'].nunique()} lokasi")
-    lines.append(f"**📊 Total Pengukuran:** {len(df_data)} records")
-    lines.append("")
-    lines.append("---")
-    
-    operator_scores = {}
-    operator_details = {}
-    
-    for operator in operators:
-        op_data = df_data[df_data['Operator'] == operator]
-        
-        rsrp = safe_agg(op_data['Average RSRP (Signal Strenght 4G)']) if 'Average RSRP (Signal Strenght 4G)' in op_data.columns else np.nan
-        speed_dl = safe_agg(op_data['Average Speed Test DL (Mbps) (4G)']) if 'Average Speed Test DL (Mbps) (4G)' in op_data.columns else np.nan
-        browsing = safe_agg(op_data['Browsing Success (%)']) if 'Browsing Success (%)' in op_data.columns else np.nan
-        youtube = safe_agg(op_data['Youtube SR (%)']) if 'Youtube SR (%)' in op_data.columns else np.nan
-        
-        score = calculate_4g_score(rsrp, speed_dl, browsing, youtube)
-        operator_scores[operator] = score
-        operator_details[operator] = {
-            'rsrp': rsrp, 'speed': speed_dl, 
-            'browsing': browsing, 'youtube': youtube
-        }
-        
-        lines.append("")
-        lines.append(f"### 👤 **{operator}**")
-        lines.append("")
-        
-        # Metrics
-        if pd.notna(rsrp):
-            cat, cls = categorize_quality(rsrp, 'rsrp')
-            lines.append(f"**📡 RSRP:** {rsrp:.2f} dBm - <span class='{cls}'>{cat}</span>")
-        
-        if pd.notna(speed_dl):
-            cat, cls = categorize_quality(speed_dl, 'speed')
-            lines.append(f"**🚀 Download Speed:** {speed_dl:.2f} Mbps - <span class='{cls}'>{cat}</span>")
-        
-        if pd.notna(browsing):
-            cat, cls = categorize_quality(browsing, 'percentage')
-            lines.append(f"**🌐 Browsing SR:** {browsing:.1f}% - <span class='{cls}'>{cat}</span>")
-        
-        if pd.notna(youtube):
-            cat, cls = categorize_quality(youtube, 'percentage')
-            lines.append(f"**📹 YouTube SR:** {youtube:.1f}% - <span class='{cls}'>{cat}</span>")
-        
-        # Coverage
-        lines.append(f"**📍 Coverage:** {op_data['Lokasi Pengukuran'].nunique()} locations, {len(op_data)} measurements")
-        
-        # Score
-        badge_cls, badge_label = get_score_badge(score)
-        lines.append("")
-        lines.append(f"**📊 Overall Score:** <span class='{badge_cls} style='padding: 0.5rem 1rem;'>{badge_label} ({score:.0f}/100)</span>")
-        lines.append("")
-        lines.append("---")
-    
-    # Ranking
-    if operator_scores:
-        lines.append("")
-        lines.append("## 🏆 **Ranking 4G Performance**")
-        lines.append("")
-        
-        sorted_ops = sorted(operator_scores.items(), key=lambda x: x[1], reverse=True)
-        for rank, (op, score) in enumerate(sorted_ops, 1):
-            medal = "🥇" if rank == 1 else "🥈" if rank == 2 else "🥉"
-            badge = " <span class='best-badge'>TERBAIK 4G</span>" if rank == 1 else ""
-            details = operator_details[op]
-            
-            lines.append(f"{medal} **{rank}. {op}**{badge}")
-            lines.append(f"   - Overall Score: {score:.0f}/100")
-            lines.append(f"   - RSRP: {details['rsrp']:.2f} dBm | Speed: {details['speed']:.2f} Mbps")
-            lines.append(f"   - Browsing: {details['browsing']:.1f}% | YouTube: {details['youtube']:.1f}%")
-            lines.append("")
-    
-    return "\n".join(lines)
+def render_rate_table(cube_filtered, tech):
+    """Exact rates from summed counts next to the row averages, per operator"""
+    rates = rate_table(cube_filtered, ['Operator'], TECH_RATES.get(tech, ()))
+    if len(rates.columns) <= 1:
+        st.info("ℹ️ Sample/attempt counts not available in this dataset")
+        return
+    st.dataframe(rates.round(2), use_container_width=True)
+    st.caption("Weighted = Σ numerator / Σ denominator, exact for any filter; "
+               "row avg = mean of per-row percentages")
 
-def generate_per_operator_conclusion_2g(df_data, operator):
-    """Generate detailed 2G conclusion for specific operator"""
-    lines = []
-    lines.append(f"## 📊 **Kesimpulan 2G - {operator}**")
-    lines.append("")
-    
-    op_data = df_data[df_data['Operator'] == operator]
-    
-    lines.append(f"**📅 Periode:** {op_data['Tanggal_Only'].min()} s/d {op_data['Tanggal_Only'].max()}")
-    lines.append(f"**📍 Total Lokasi:** {op_data['Lokasi Pengukuran'].nunique()}")
-    lines.append(f"**📊 Total Measurements:** {len(op_data)}")
-    lines.append("")
-    lines.append("---")
-    
-    # Overall Metrics
-    lines.append("### 📈 **Overall Performance**")
-    lines.append("")
-    
-    if 'Average RxLev (2G)' in op_data.columns:
-        rxlev_avg = safe_agg(op_data['Average RxLev (2G)'], 'mean')
-        rxlev_min = safe_agg(op_data['Average RxLev (2G)'], 'min')
-        rxlev_max = safe_agg(op_data['Average RxLev (2G)'], 'max')
-        
-        if pd.notna(rxlev_avg):
-            cat, cls = categorize_quality(rxlev_avg, 'rxlev')
-            lines.append(f"**📶 RxLev (Signal Strength):**")
-            lines.append(f"- Average: {rxlev_avg:.2f} dBm - <span class='{cls}'>{cat}</span>")
-            lines.append(f"- Range: {rxlev_min:.2f} to {rxlev_max:.2f} dBm")
-            lines.append("")
-    
-    if 'Average RxQual (2G)' in op_data.columns:
-        rxqual_avg = safe_agg(op_data['Average RxQual (2G)'], 'mean')
-        rxqual_min = safe_agg(op_data['Average RxQual (2G)'], 'min')
-        rxqual_max = safe_agg(op_data['Average RxQual (2G)'], 'max')
-        
-        if pd.notna(rxqual_avg):
-            cat, cls = categorize_quality(rxqual_avg, 'rxqual')
-            lines.append(f"**📡 RxQual (Signal Quality):**")
-            lines.append(f"- Average: {rxqual_avg:.2f} - <span class='{cls}'>{cat}</span>")
-            lines.append(f"- Range: {rxqual_min:.2f} to {rxqual_max:.2f}")
-            lines.append("")
-    
-    # Location Analysis
-    lines.append("---")
-    lines.append("### 📍 **Per Location Summary**")
-    lines.append("")
-    
-    location_groups = op_data.groupby('Lokasi Pengukuran')
-    for loc, loc_data in list(location_groups)[:5]:  # Top 5 locations
-        rxlev_loc = safe_agg(loc_data['Average RxLev (2G)']) if 'Average RxLev (2G)' in loc_data.columns else np.nan
-        rxqual_loc = safe_agg(loc_data['Average RxQual (2G)']) if 'Average RxQual (2G)' in loc_data.columns else np.nan
-        
-        score_loc = calculate_2g_score(rxlev_loc, rxqual_loc)
-        badge_cls, badge_label = get_score_badge(score_loc)
-        
-        lines.append(f"**{loc}:**")
-        if pd.notna(rxlev_loc):
-            lines.append(f"- RxLev: {rxlev_loc:.2f} dBm")
-        if pd.notna(rxqual_loc):
-            lines.append(f"- RxQual: {rxqual_loc:.2f}")
-        lines.append(f"- Score: <span class='{badge_cls}'>{score_loc:.0f}/100</span>")
-        lines.append("")
-    
-    if len(location_groups) > 5:
-        lines.append(f"*...dan {len(location_groups) - 5} lokasi lainnya*")
-    
-    # Overall Score
-    rxlev_overall = safe_agg(op_data['Average RxLev (2G)']) if 'Average RxLev (2G)' in op_data.columns else np.nan
-    rxqual_overall = safe_agg(op_data['Average RxQual (2G)']) if 'Average RxQual (2G)' in op_data.columns else np.nan
-    score_overall = calculate_2g_score(rxlev_overall, rxqual_overall)
-    badge_cls, badge_label = get_score_badge(score_overall)
-    
-    lines.append("")
-    lines.append("---")
-    lines.append(f"### 🎯 **Overall Score: <span class='{badge_cls} style='padding: 0.5rem 1rem;'>{badge_label} ({score_overall:.0f}/100)</span>**")
-    
-    return "\n".join(lines)
+def render_location_ranking(df_filtered, cube_filtered, tech):
+    """Per-location score table, ranked best first"""
+    ranking = location_scores(df_filtered, tech, cube=cube_filtered)
+    score_col = f"Score {tech}"
+    if ranking.empty:
+        st.info("ℹ️ No locations to rank")
+        return
+    ranking = ranking.sort_values(score_col, ascending=False).reset_index(drop=True)
+    ranking.index = ranking.index + 1
+    ranking['Badge'] = get_score_badge_array(ranking[score_col])[1]
+    st.dataframe(ranking.round(2), use_container_width=True, height=350)
 
-def generate_per_operator_conclusion_4g(df_data, operator):
-    """Generate detailed 4G conclusion for specific operator"""
-    lines = []
-    lines.append(f"## 📊 **Kesimpulan 4G - {operator}**")
-    lines.append("")
-    
-    op_data = df_data[df_data['Operator'] == operator]
-    
-    lines.append(f"**📅 Periode:** {op_data['Tanggal_Only'].min()} s/d {op_data['Tanggal_Only'].max()}")
-    lines.append(f"**📍 Total Lokasi:** {op_data['Lokasi Pengukuran'].nunique()}")
-    lines.append(f"**📊 Total Measurements:** {len(op_data)}")
-    lines.append("")
-    lines.append("---")
-    
-    # Overall Metrics
-    lines.append("### 📈 **Overall Performance**")
-    lines.append("")
-    
-    metrics_4g = [
-        ('Average RSRP (Signal Strenght 4G)', 'RSRP', 'dBm', 'rsrp'),
-        ('Average Speed Test DL (Mbps) (4G)', 'Download Speed', 'Mbps', 'speed'),
-        ('Browsing Success (%)', 'Browsing Success Rate', '%', 'percentage'),
-        ('Youtube SR (%)', 'YouTube Success Rate', '%', 'percentage')
-    ]
-    
-    for col, label, unit, metric_type in metrics_4g:
-        if col in op_data.columns:
-            val_avg = safe_agg(op_data[col], 'mean')
-            val_min = safe_agg(op_data[col], 'min')
-            val_max = safe_agg(op_data[col], 'max')
-            
-            if pd.notna(val_avg):
-                cat, cls = categorize_quality(val_avg, metric_type)
-                lines.append(f"**{label}:**")
-                lines.append(f"- Average: {val_avg:.2f} {unit} - <span class='{cls}'>{cat}</span>")
-                lines.append(f"- Range: {val_min:.2f} to {val_max:.2f} {unit}")
-                lines.append("")
-    
-    # Location Analysis
-    lines.append("---")
-    lines.append("### 📍 **Per Location Summary**")
-    lines.append("")
-    
-    location_groups = op_data.groupby('Lokasi Pengukuran')
-    for loc, loc_data in list(location_groups)[:5]:  # Top 5 locations
-        rsrp_loc = safe_agg(loc_data['Average RSRP (Signal Strenght 4G)']) if 'Average RSRP (Signal Strenght 4G)' in loc_data.columns else np.nan
-        speed_loc = safe_agg(loc_data['Average Speed Test DL (Mbps) (4G)']) if 'Average Speed Test DL (Mbps) (4G)' in loc_data.columns else np.nan
-        browsing_loc = safe_agg(loc_data['Browsing Success (%)']) if 'Browsing Success (%)' in loc_data.columns else np.nan
-        youtube_loc = safe_agg(loc_data['Youtube SR (%)']) if 'Youtube SR (%)' in loc_data.columns else np.nan
-        
-        score_loc = calculate_4g_score(rsrp_loc, speed_loc, browsing_loc, youtube_loc)
-        badge_cls, badge_label = get_score_badge(score_loc)
-        
-        lines.append(f"**{loc}:**")
-        if pd.notna(rsrp_loc):
-            lines.append(f"- RSRP: {rsrp_loc:.2f} dBm")
-        if pd.notna(speed_loc):
-            lines.append(f"- DL Speed: {speed_loc:.2f} Mbps")
-        lines.append(f"- Score: <span class='{badge_cls}'>{score_loc:.0f}/100</span>")
-        lines.append("")
-    
-    if len(location_groups) > 5:
-        lines.append(f"*...dan {len(location_groups) - 5} lokasi lainnya*")
-    
-    # Overall Score
-    rsrp_overall = safe_agg(op_data['Average RSRP (Signal Strenght 4G)']) if 'Average RSRP (Signal Strenght 4G)' in op_data.columns else np.nan
-    speed_overall = safe_agg(op_data['Average Speed Test DL (Mbps) (4G)']) if 'Average Speed Test DL (Mbps) (4G)' in op_data.columns else np.nan
-    browsing_overall = safe_agg(op_data['Browsing Success (%)']) if 'Browsing Success (%)' in op_data.columns else np.nan
-    youtube_overall = safe_agg(op_data['Youtube SR (%)']) if 'Youtube SR (%)' in op_data.columns else np.nan
-    
-    score_overall = calculate_4g_score(rsrp_overall, speed_overall, browsing_overall, youtube_overall)
-    badge_cls, badge_label = get_score_badge(score_overall)
-    
-    lines.append("")
-    lines.append("---")
-    lines.append(f"### 🎯 **Overall Score: <span class='{badge_cls} style='padding: 0.5rem 1rem;'>{badge_label} ({score_overall:.0f}/100)</span>**")
-    
-    return "\n".join(lines)
+def render_quality_distribution(distribution):
+    """Band share per operator for every metric, one stacked chart plus the counts"""
+    distribution = distribution[distribution['Total'] > 0]
+    if distribution.empty:
+        st.info("ℹ️ No values to band")
+        return
+    long = distribution.melt(id_vars=['Operator', 'Metric', 'Total'], value_vars=list(QUALITY_LABELS),
+                             var_name='Quality', value_name='Count')
+    long['Share (%)'] = long['Count'] / long['Total'] * 100
+    long['Metric'] = long['Metric'].str.replace(r'^Average ', '', regex=True).str.split('(').str[0].str.strip()
+    fig = px.bar(long, x='Operator', y='Share (%)', color='Quality', facet_col='Metric',
+                 color_discrete_map=QUALITY_COLORS, category_orders={'Quality': list(QUALITY_LABELS)},
+                 hover_data=['Count', 'Total'])
+    fig.update_layout(height=450, barmode='stack', plot_bgcolor='white', paper_bgcolor='#f8f9fa',
+                      legend={'orientation': 'h', 'yanchor': 'bottom', 'y': 1.08,
+                              'xanchor': 'center', 'x': 0.5, 'title': None},
+                      margin={'t': 80, 'b': 40, 'l': 60, 'r': 20})
+    fig.for_each_annotation(lambda a: a.update(text=a.text.split('=')[-1]))
+    st.plotly_chart(fig, use_container_width=True)
+    st.dataframe(distribution.reset_index(drop=True), use_container_width=True)
 
-# ===== DASHBOARD SECTIONS =====
-def render_2g_dashboard_enhanced(df_filtered):
+def render_2g_dashboard_enhanced(df_filtered, cube_filtered, sketches_filtered, view_key, rate_mode, detail=None):
     """Enhanced 2G Dashboard with detailed information"""
     st.markdown('<div class="tech-mode-2g">📶 2G Technology - Enhanced Analysis</div>', unsafe_allow_html=True)
     
@@ -1004,174 +730,270 @@ def render_2g_dashboard_enhanced(df_filtered):
     # Overview
     st.markdown('<div class="section-header section-header-2g">📊 2G Overview</div>', unsafe_allow_html=True)
     
+    # One stats table per filter state feeds both the overview tiles and the operator cards
+    stats = get_operator_stats(df_filtered, cube_filtered, sketches_filtered, view_key, '2G')
+    overview = stats[stats['Operator'] == OVERALL_OPERATOR].set_index('Metric')
+    operators = sorted(stats.loc[stats['Operator'] != OVERALL_OPERATOR, 'Operator'].unique())
     col1, col2, col3, col4, col5 = st.columns(5)
     
     with col1:
-        if 'Average RxLev (2G)' in df_filtered.columns:
-            avg_rxlev = df_filtered['Average RxLev (2G)'].mean()
+        if 'Average RxLev (2G)' in overview.index:
+            avg_rxlev = overview.loc['Average RxLev (2G)', 'mean']
             st.metric("Avg RxLev", f"{avg_rxlev:.1f} dBm" if pd.notna(avg_rxlev) else "N/A")
     
     with col2:
-        if 'Average RxQual (2G)' in df_filtered.columns:
-            avg_rxqual = df_filtered['Average RxQual (2G)'].mean()
+        if 'Average RxQual (2G)' in overview.index:
+            avg_rxqual = overview.loc['Average RxQual (2G)', 'mean']
             st.metric("Avg RxQual", f"{avg_rxqual:.2f}" if pd.notna(avg_rxqual) else "N/A")
     
     with col3:
-        st.metric("Locations", df_filtered['Lokasi Pengukuran'].nunique())
+        st.metric("Locations", int(overview[LOCATIONS_COLUMN].iloc[0]))
     
     with col4:
-        st.metric("Operators", df_filtered['Operator'].nunique())
+        st.metric("Operators", len(operators))
     
     with col5:
-        st.metric("Measurements", len(df_filtered))
+        st.metric("Measurements", int(overview[RECORDS_COLUMN].iloc[0]))
     
     # Detailed per Operator
     st.markdown('<div class="section-header section-header-2g">📈 Detailed 2G Metrics per Operator</div>', unsafe_allow_html=True)
     
-    operators = sorted(df_filtered['Operator'].unique())
-    
-    for operator in operators:
-        op_data = df_filtered[df_filtered['Operator'] == operator]
-        render_2g_detailed_info(op_data, operator)
+    # Only expanded cards are sent; each one just formats its rows of the stats table
+    cards = [(operator, st.expander(f"👤 {operator}", expanded=operator == operators[0],
+                                    key=f'card_2g_{operator}', on_change='rerun'))
+             for operator in operators]
+    for operator, card in cards:
+        if card.open:
+            with card:
+                render_2g_detailed_info(operator, stats[stats['Operator'] == operator].set_index('Metric'))
     
     # Charts
     st.markdown('<div class="section-header section-header-2g">📊 2G Performance Comparison</div>', unsafe_allow_html=True)
     
-    tab1, tab2 = st.tabs(["📶 RxLev Analysis", "📡 RxQual Analysis"])
+    location_summary = get_metric_summary(cube_filtered, sketches_filtered, view_key, ('Lokasi Pengukuran', 'Operator'), '2G')
+    location_means = apply_rate_mode(summary_stat(location_summary, 'mean'), cube_filtered, rate_mode)
+    chart_means, x_col = chart_data(location_means, cube_filtered, rate_mode, detail)
+    # Only the selected tab runs; switching tabs reruns with cached data and figures
+    tab1, tab2 = st.tabs(["📶 RxLev Analysis", "📡 RxQual Analysis"], key='tabs_2g', on_change='rerun')
     
     with tab1:
-        if 'Average RxLev (2G)' in df_filtered.columns:
-            agg = df_filtered.groupby(['Lokasi Pengukuran', 'Operator'], as_index=False).agg({
-                'Average RxLev (2G)': lambda x: safe_agg(x)
-            })
-            fig = create_enhanced_chart(agg, 'Lokasi Pengukuran',
-                'Average RxLev (2G)', '2G RxLev by Location', chart_type='signal')
+        if tab1.open and 'Average RxLev (2G)' in df_filtered.columns:
+            fig = create_enhanced_chart(chart_means, x_col,
+                'Average RxLev (2G)', '2G RxLev by Location', chart_type='signal',
+                cache_key=(view_key, rate_mode), detail=detail)
             if fig:
                 st.plotly_chart(fig, use_container_width=True)
     
     with tab2:
-        if 'Average RxQual (2G)' in df_filtered.columns:
-            agg = df_filtered.groupby(['Lokasi Pengukuran', 'Operator'], as_index=False).agg({
-                'Average RxQual (2G)': lambda x: safe_agg(x)
-            })
-            fig = create_enhanced_chart(agg, 'Lokasi Pengukuran',
-                'Average RxQual (2G)', '2G RxQual by Location', chart_type='speed')
+        if tab2.open and 'Average RxQual (2G)' in df_filtered.columns:
+            fig = create_enhanced_chart(chart_means, x_col,
+                'Average RxQual (2G)', '2G RxQual by Location', chart_type='speed',
+                cache_key=(view_key, rate_mode), detail=detail)
             if fig:
                 st.plotly_chart(fig, use_container_width=True)
     
+    # Sample-Weighted Rates
+    st.markdown('<div class="section-header section-header-2g">⚖️ 2G Bad Sample Rates</div>', unsafe_allow_html=True)
+    render_rate_table(cube_filtered, '2G')
+    
+    # Location Ranking
+    st.markdown('<div class="section-header section-header-2g">🏆 2G Location Ranking</div>', unsafe_allow_html=True)
+    render_location_ranking(df_filtered, cube_filtered, '2G')
+    
     # Data Export
     st.markdown('<div class="section-header section-header-2g">📋 2G Data Export</div>', unsafe_allow_html=True)
     
-    cols_2g = ['Operator', 'Lokasi Pengukuran', 'Tanggal_Only', 'Average RxLev (2G)', 'Average RxQual (2G)']
-    display_cols = [c for c in cols_2g if c in df_filtered.columns]
+    if any(c in df_filtered.columns for c in EXPORT_COLUMNS['2G']):
+        export = get_export_table(df_filtered, view_key, '2G')
+        render_paged_table(export, view_key, "2G_Data")
+        render_export(export, view_key, "2G_Data")
     
-    if display_cols:
-        st.dataframe(df_filtered[display_cols].sort_values('Lokasi Pengukuran'), use_container_width=True, height=400)
-        st.markdown(download_dataframe_as_excel(df_filtered[display_cols], "2G_Data.xlsx"), unsafe_allow_html=True)
+    if not location_summary.empty:
+        st.markdown("**📊 Summary per Location & Operator**")
+        render_paged_table(location_summary.round(2), view_key, "2G_Summary", height=350)
+        render_export(location_summary, view_key, "2G_Summary")
 
-def render_4g_dashboard(df_filtered):
+def render_4g_dashboard(df_filtered, cube_filtered, sketches_filtered, view_key, rate_mode, detail=None):
     """4G Dashboard"""
     st.markdown('<div class="tech-mode-4g">📡 4G Technology Dashboard</div>', unsafe_allow_html=True)
     
     # Overview
     st.markdown('<div class="section-header section-header-4g">📊 4G Overview</div>', unsafe_allow_html=True)
     
+    overview = rollup_cube(cube_filtered, metrics=TECH_COLUMNS['4G']).iloc[0]
+    rsrp_col, dl_col, _, youtube_col = scored_columns('4G')
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        if 'Average RSRP (Signal Strenght 4G)' in df_filtered.columns:
-            avg_rsrp = df_filtered['Average RSRP (Signal Strenght 4G)'].mean()
+        if rsrp_col in df_filtered.columns:
+            avg_rsrp = overview[f"{rsrp_col} [mean]"]
             st.metric("Avg RSRP", f"{avg_rsrp:.1f} dBm" if pd.notna(avg_rsrp) else "N/A")
     
     with col2:
-        if 'Average Speed Test DL (Mbps) (4G)' in df_filtered.columns:
-            avg_dl = df_filtered['Average Speed Test DL (Mbps) (4G)'].mean()
+        if dl_col in df_filtered.columns:
+            avg_dl = overview[f"{dl_col} [mean]"]
             st.metric("Avg DL Speed", f"{avg_dl:.1f} Mbps" if pd.notna(avg_dl) else "N/A")
     
     with col3:
-        if 'Youtube SR (%)' in df_filtered.columns:
-            avg_yt = df_filtered['Youtube SR (%)'].mean()
+        if youtube_col in df_filtered.columns:
+            avg_yt = overview[f"{youtube_col} [weighted]" if rate_mode == "Sample-Weighted" else f"{youtube_col} [mean]"]
             st.metric("YouTube SR", f"{avg_yt:.1f}%" if pd.notna(avg_yt) else "N/A")
     
     with col4:
-        st.metric("Locations", df_filtered['Lokasi Pengukuran'].nunique())
+        st.metric("Locations", int(overview[LOCATIONS_COLUMN]))
     
     # Charts
     st.markdown('<div class="section-header section-header-4g">📈 4G Performance</div>', unsafe_allow_html=True)
     
-    tab1, tab2, tab3 = st.tabs(["📡 Signal", "🚀 Speed", "📹 Services"])
+    location_summary = get_metric_summary(cube_filtered, sketches_filtered, view_key, ('Lokasi Pengukuran', 'Operator'), '4G')
+    location_means = apply_rate_mode(summary_stat(location_summary, 'mean'), cube_filtered, rate_mode)
+    chart_means, x_col = chart_data(location_means, cube_filtered, rate_mode, detail)
+    # Only the selected tab runs; switching tabs reruns with cached data and figures
+    tab1, tab2, tab3 = st.tabs(["📡 Signal", "🚀 Speed", "📹 Services"], key='tabs_4g', on_change='rerun')
     
     with tab1:
-        if 'Average RSRP (Signal Strenght 4G)' in df_filtered.columns:
-            agg = df_filtered.groupby(['Lokasi Pengukuran', 'Operator'], as_index=False).agg({
-                'Average RSRP (Signal Strenght 4G)': lambda x: safe_agg(x)
-            })
-            fig = create_enhanced_chart(agg, 'Lokasi Pengukuran',
-                'Average RSRP (Signal Strenght 4G)', '4G RSRP', chart_type='signal')
+        if tab1.open and 'Average RSRP (Signal Strenght 4G)' in df_filtered.columns:
+            fig = create_enhanced_chart(chart_means, x_col,
+                'Average RSRP (Signal Strenght 4G)', '4G RSRP', chart_type='signal',
+                cache_key=(view_key, rate_mode), detail=detail)
             if fig:
                 st.plotly_chart(fig, use_container_width=True)
     
     with tab2:
-        col_a, col_b = st.columns(2)
-        with col_a:
-            if 'Average Speed Test DL (Mbps) (4G)' in df_filtered.columns:
-                agg = df_filtered.groupby(['Lokasi Pengukuran', 'Operator'], as_index=False).agg({
-                    'Average Speed Test DL (Mbps) (4G)': lambda x: safe_agg(x)
-                })
-                fig = create_enhanced_chart(agg, 'Lokasi Pengukuran',
-                    'Average Speed Test DL (Mbps) (4G)', 'Download Speed', chart_type='speed')
-                if fig:
-                    st.plotly_chart(fig, use_container_width=True)
-        
-        with col_b:
-            if 'Average Speed Test UL (Mbps) (4G)' in df_filtered.columns:
-                agg = df_filtered.groupby(['Lokasi Pengukuran', 'Operator'], as_index=False).agg({
-                    'Average Speed Test UL (Mbps) (4G)': lambda x: safe_agg(x)
-                })
-                fig = create_enhanced_chart(agg, 'Lokasi Pengukuran',
-                    'Average Speed Test UL (Mbps) (4G)', 'Upload Speed', chart_type='speed')
-                if fig:
-                    st.plotly_chart(fig, use_container_width=True)
+        if tab2.open:
+            col_a, col_b = st.columns(2)
+            with col_a:
+                if 'Average Speed Test DL (Mbps) (4G)' in df_filtered.columns:
+                    fig = create_enhanced_chart(chart_means, x_col,
+                        'Average Speed Test DL (Mbps) (4G)', 'Download Speed', chart_type='speed',
+                        cache_key=(view_key, rate_mode), detail=detail)
+                    if fig:
+                        st.plotly_chart(fig, use_container_width=True)
+            
+            with col_b:
+                if 'Average Speed Test UL (Mbps) (4G)' in df_filtered.columns:
+                    fig = create_enhanced_chart(chart_means, x_col,
+                        'Average Speed Test UL (Mbps) (4G)', 'Upload Speed', chart_type='speed',
+                        cache_key=(view_key, rate_mode), detail=detail)
+                    if fig:
+                        st.plotly_chart(fig, use_container_width=True)
     
     with tab3:
-        col_a, col_b = st.columns(2)
-        with col_a:
-            if 'Browsing Success (%)' in df_filtered.columns:
-                agg = df_filtered.groupby(['Lokasi Pengukuran', 'Operator'], as_index=False).agg({
-                    'Browsing Success (%)': lambda x: safe_agg(x)
-                })
-                fig = create_enhanced_chart(agg, 'Lokasi Pengukuran',
-                    'Browsing Success (%)', 'Browsing Success Rate', chart_type='speed')
-                if fig:
-                    st.plotly_chart(fig, use_container_width=True)
-        
-        with col_b:
-            if 'Youtube SR (%)' in df_filtered.columns:
-                agg = df_filtered.groupby(['Lokasi Pengukuran', 'Operator'], as_index=False).agg({
-                    'Youtube SR (%)': lambda x: safe_agg(x)
-                })
-                fig = create_enhanced_chart(agg, 'Lokasi Pengukuran',
-                    'Youtube SR (%)', 'YouTube Success Rate', chart_type='speed')
-                if fig:
-                    st.plotly_chart(fig, use_container_width=True)
+        if tab3.open:
+            col_a, col_b = st.columns(2)
+            with col_a:
+                if 'Browsing Success (%)' in df_filtered.columns:
+                    fig = create_enhanced_chart(chart_means, x_col,
+                        'Browsing Success (%)', 'Browsing Success Rate', chart_type='speed',
+                        cache_key=(view_key, rate_mode), detail=detail)
+                    if fig:
+                        st.plotly_chart(fig, use_container_width=True)
+            
+            with col_b:
+                if 'Youtube SR (%)' in df_filtered.columns:
+                    fig = create_enhanced_chart(chart_means, x_col,
+                        'Youtube SR (%)', 'YouTube Success Rate', chart_type='speed',
+                        cache_key=(view_key, rate_mode), detail=detail)
+                    if fig:
+                        st.plotly_chart(fig, use_container_width=True)
+    
+    # Quality Distribution
+    st.markdown('<div class="section-header section-header-4g">📊 4G Quality Distribution</div>', unsafe_allow_html=True)
+    render_quality_distribution(get_quality_distribution(df_filtered, view_key, '4G'))
+    
+    percentiles = get_percentiles(sketches_filtered, view_key, ('Operator',))
+    percentiles = percentiles[percentiles['Metric'].isin(TECH_COLUMNS['4G'])]
+    if not percentiles.empty:
+        st.markdown("**📐 Percentile Bands per Operator (P10 / Median / P90):**")
+        bands = percentiles.pivot(index='Operator', columns='Metric', values=['P10', 'Median', 'P90'])
+        bands = bands.swaplevel(axis=1).sort_index(axis=1, level=0, sort_remaining=False)
+        bands.columns = [f"{metric} [{stat}]" for metric, stat in bands.columns]
+        st.dataframe(bands.round(2), use_container_width=True)
+    
+    # Sample-Weighted Rates
+    st.markdown('<div class="section-header section-header-4g">⚖️ 4G Bad Sample & Success Rates</div>', unsafe_allow_html=True)
+    render_rate_table(cube_filtered, '4G')
+    
+    # Location Ranking
+    st.markdown('<div class="section-header section-header-4g">🏆 4G Location Ranking</div>', unsafe_allow_html=True)
+    render_location_ranking(df_filtered, cube_filtered, '4G')
     
     # Data Export
     st.markdown('<div class="section-header section-header-4g">📋 4G Data Export</div>', unsafe_allow_html=True)
     
-    cols_4g = ['Operator', 'Lokasi Pengukuran', 'Tanggal_Only', 
-               'Average RSRP (Signal Strenght 4G)', 'Average Speed Test DL (Mbps) (4G)', 
-               'Youtube SR (%)']
-    display_cols = [c for c in cols_4g if c in df_filtered.columns]
+    if any(c in df_filtered.columns for c in EXPORT_COLUMNS['4G']):
+        export = get_export_table(df_filtered, view_key, '4G')
+        render_paged_table(export, view_key, "4G_Data")
+        render_export(export, view_key, "4G_Data")
+    
+    if not location_summary.empty:
+        st.markdown("**📊 Summary per Location & Operator**")
+        render_paged_table(location_summary.round(2), view_key, "4G_Summary", height=350)
+        render_export(location_summary, view_key, "4G_Summary")
+
+def render_registry_dashboard(df_filtered, cube_filtered, view_key, tech, detail=None):
+    """Generic dashboard for any registry technology: tiles, per-operator
+    evaluation, per-location charts, quality distribution and rates"""
+    st.markdown(f'<div class="tech-mode-4g">📊 {tech} Dashboard</div>', unsafe_allow_html=True)
+    
+    overall = evaluate_cube(cube_filtered, tech).iloc[0]
+    columns = [col for col in registry_columns(tech) if overall.get(f"{col} [count]", 0) > 0]
+    if not columns:
+        st.warning(f"⚠️ Data {tech} tidak tersedia dalam dataset")
+        return
+    
+    # Overview
+    st.markdown(f'<div class="section-header section-header-4g">📊 {tech} Overview</div>', unsafe_allow_html=True)
+    
+    tiles = st.columns(len(columns) + 1)
+    for tile, col in zip(tiles, columns):
+        spec = METRIC_REGISTRY[col]
+        value = overall[f"{col} [mean]"]
+        with tile:
+            st.metric(spec['label'], f"{value:.2f} {spec['unit']}".strip())
+            cat, cls = categorize_quality(value, spec['quality'])
+            st.markdown(f"<span class='{cls}'>{cat}</span>", unsafe_allow_html=True)
+    with tiles[-1]:
+        score = overall[f"Score {tech}"]
+        badge_cls, badge_label = get_score_badge(score)
+        st.metric(f"Score {tech}", f"{score:.0f}/100")
+        st.markdown(f"<span class='{badge_cls}'>{badge_label}</span>", unsafe_allow_html=True)
+    
+    # Per Operator
+    st.markdown(f'<div class="section-header section-header-4g">👥 {tech} per Operator</div>', unsafe_allow_html=True)
+    st.dataframe(evaluate_cube(cube_filtered, tech, ['Operator']).round(2), use_container_width=True)
+    
+    # Charts
+    st.markdown(f'<div class="section-header section-header-4g">📈 {tech} Performance</div>', unsafe_allow_html=True)
+    
+    location_means = cube_means(cube_filtered, ['Lokasi Pengukuran', 'Operator'], columns)
+    chart_means, x_col = chart_data(location_means, cube_filtered, None, detail)
+    tabs = st.tabs([METRIC_REGISTRY[col]['label'] for col in columns], key=f'tabs_{tech}', on_change='rerun')
+    for tab, col in zip(tabs, columns):
+        if not tab.open:
+            continue
+        with tab:
+            chart_type = 'signal' if overall[f"{col} [max]"] <= 0 else 'speed'
+            fig = create_enhanced_chart(chart_means, x_col, col,
+                f"{tech} {METRIC_REGISTRY[col]['label']} by Location", chart_type=chart_type,
+                cache_key=view_key, detail=detail)
+            if fig:
+                st.plotly_chart(fig, use_container_width=True)
+    
+    # Quality Distribution
+    st.markdown(f'<div class="section-header section-header-4g">📊 {tech} Quality Distribution</div>', unsafe_allow_html=True)
+    render_quality_distribution(get_quality_distribution(df_filtered, view_key, tech))
     
-    if display_cols:
-        st.dataframe(df_filtered[display_cols].sort_values('Lokasi Pengukuran'), use_container_width=True, height=400)
-        st.markdown(download_dataframe_as_excel(df_filtered[display_cols], "4G_Data.xlsx"), unsafe_allow_html=True)
+    if TECH_RATES.get(tech):
+        st.markdown(f'<div class="section-header section-header-4g">⚖️ {tech} Rates</div>', unsafe_allow_html=True)
+        render_rate_table(cube_filtered, tech)
 
-def render_conclusions_menu(df_filtered, tech='2G'):
-    """Dedicated conclusions menu"""
+@st.fragment
+def render_conclusions_menu(cube_filtered, view_key, tech='2G'):
+    """Dedicated conclusions menu; picking a type or operator reruns only this panel"""
     st.markdown(f'<div class="section-header">📋 Menu Kesimpulan {tech}</div>', unsafe_allow_html=True)
     
-    operators = sorted(df_filtered['Operator'].unique())
+    operators = sorted(cube_filtered['Operator'].unique())
     
     conclusion_type = st.radio(
         "Pilih Jenis Kesimpulan:",
@@ -1185,10 +1007,7 @@ def render_conclusions_menu(df_filtered, tech='2G'):
     if conclusion_type == "📊 Overall (Semua Operator)":
         st.markdown('<div class="conclusion-box">', unsafe_allow_html=True)
         
-        if tech == '2G':
-            conclusion = generate_overall_conclusion_2g(df_filtered, operators)
-        else:
-            conclusion = generate_overall_conclusion_4g(df_filtered, operators)
+        conclusion = get_conclusion(cube_filtered, view_key, tech, tuple(operators))
         
         st.markdown(conclusion, unsafe_allow_html=True)
         st.markdown('</div>', unsafe_allow_html=True)
@@ -1202,35 +1021,130 @@ def render_conclusions_menu(df_filtered, tech='2G'):
         
         st.markdown('<div class="conclusion-box">', unsafe_allow_html=True)
         
-        if tech == '2G':
-            conclusion = generate_per_operator_conclusion_2g(df_filtered, selected_operator)
-        else:
-            conclusion = generate_per_operator_conclusion_4g(df_filtered, selected_operator)
+        conclusion = get_conclusion(cube_filtered, view_key, tech, tuple(operators), selected_operator)
         
         st.markdown(conclusion, unsafe_allow_html=True)
         st.markdown('</div>', unsafe_allow_html=True)
 
+def render_period_comparison(data_files, filters, detail=None):
+    """Period-over-period deltas per operator or location, computed from the
+    per-file summaries only (files or calendar windows as periods)"""
+    st.markdown('<div class="section-header">📈 Perbandingan Periode</div>', unsafe_allow_html=True)
+    
+    if not data_files:
+        st.info(f"ℹ️ Perbandingan periode membutuhkan file di folder '{DATA_FOLDER}'")
+        return
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        period_mode = st.radio("Periode:", list(PERIOD_MODES), key='compare_mode', horizontal=True)
+    with col2:
+        tech = st.radio("Teknologi:", list(COMPARISON_METRICS), key='compare_tech', horizontal=True)
+    with col3:
+        level = st.radio("Level:", ["Operator", "Lokasi Pengukuran"], key='compare_level', horizontal=True)
+    
+    file_names = [os.path.basename(f) for f in data_files]
+    selected = st.multiselect("📂 Files", file_names, default=file_names, key='compare_files')
+    
+    summaries = {}
+    for name in selected:
+        path = data_files[file_names.index(name)]
+        summary, error = get_file_summary(path, get_cache_key(path))
+        if error:
+            st.warning(f"⚠️ {name}: {error}")
+            continue
+        summaries[name] = apply_filters(summary['cube'], filters)
+    
+    freq = PERIOD_MODES[period_mode]
+    if freq is None:
+        periods = order_periods(summaries)
+    else:
+        merged = pd.concat(list(summaries.values()), ignore_index=True) if summaries else pd.DataFrame()
+        periods = period_windows(merged, freq) if 'Tanggal_Only' in merged.columns else {}
+    
+    if len(periods) < 2:
+        st.info("💡 Select data covering at least two periods")
+        return
+    
+    by = ['Operator'] if level == "Operator" else ['Lokasi Pengukuran', 'Operator']
+    comparison = compare_periods(periods, tech, by)
+    if comparison.empty:
+        st.warning(f"⚠️ Data {tech} tidak tersedia dalam periode yang dipilih")
+        return
+    deltas = period_deltas(comparison, by)
+    st.caption(f"⚡ {len(periods)} periode dari {len(summaries)} ringkasan file; "
+               f"Δ = periode terakhir - periode pertama")
+    
+    values = [col for col in comparison.columns if col not in by + [PERIOD_COLUMN, RECORDS_COLUMN]]
+    metric = st.selectbox("Metrik:", values, index=len(values) - 1, key='compare_metric')
+    
+    if level == "Operator":
+        fig = px.line(comparison, x=PERIOD_COLUMN, y=metric, color='Operator', markers=True,
+                      color_discrete_map=OPERATOR_COLORS, category_orders={PERIOD_COLUMN: list(periods)},
+                      title=f"{metric} per Periode")
+    else:
+        ranked = deltas.dropna(subset=[f"{metric} [Δ]"])
+        title = f"Δ {metric} per Lokasi"
+        if detail is not None and ranked['Lokasi Pengukuran'].nunique() > CHART_LOCATION_LIMIT:
+            # Largest movers only
+            n = detail[1] or CHART_LOCATION_LIMIT
+            movers = ranked.groupby('Lokasi Pengukuran')[f"{metric} [Δ]"].mean().abs().nlargest(n).index
+            ranked = ranked[ranked['Lokasi Pengukuran'].isin(movers)]
+            title += f" - Top {n} perubahan"
+        fig = px.bar(ranked.sort_values(f"{metric} [Δ]"), x='Lokasi Pengukuran', y=f"{metric} [Δ]", color='Operator',
+                     barmode='group', color_discrete_map=OPERATOR_COLORS, title=title)
+    fig.update_layout(height=450, plot_bgcolor='white', paper_bgcolor='#f8f9fa')
+    st.plotly_chart(fig, use_container_width=True)
+    
+    st.dataframe(deltas.round(2), use_container_width=True, height=350)
+
 # ===== MAIN APP =====
-def main():
-    st.markdown('<p class="main-header">📡 QoS Dashboard v2.0 - Enhanced</p>', unsafe_allow_html=True)
+def source_id(source):
+    """Identity of a data source selection, for change detection"""
+    if source['file_paths']:
+        return ('files', tuple(source['file_paths']))
+    if isinstance(source['file_path'], str):
+        return ('file', source['file_path'])
+    if source['file_path'] is not None:
+        uploaded = source['file_path']
+        return ('upload', getattr(uploaded, 'file_id', None) or (uploaded.name, uploaded.size))
+    return None
+
+@st.fragment
+def render_data_source(data_files):
+    """Sidebar source picker, stored as st.session_state['data_source'].
     
-    # Sidebar
+    Its widgets rerun only this fragment; the app is rerun (and data
+    reloaded) only when the selected source actually changes.
+    """
     with st.sidebar:
         st.title("📁 Data Source")
         
-        data_files = get_data_files(DATA_FOLDER)
         file_path = None
+        file_paths = []
         
         if data_files:
             st.success(f"✅ {len(data_files)} file(s) found")
             file_names = [os.path.basename(f) for f in data_files]
-            selected_file = st.selectbox("📂 Select File", file_names, key='file_select')
-            idx = file_names.index(selected_file)
-            file_path = data_files[idx]
-            info = get_file_info(file_path)
-            if info:
-                st.info(f"📊 Size: {info['size']}")
-                st.caption(f"Modified: {info['modified']}")
+            load_mode = st.radio("Load Mode:", ["Single File", "Multiple Files"],
+                                 key='load_mode', horizontal=True)
+            
+            if load_mode == "Single File":
+                selected_file = st.selectbox("📂 Select File", file_names, key='file_select')
+                idx = file_names.index(selected_file)
+                file_path = data_files[idx]
+                info = get_file_info(file_path)
+                if info:
+                    st.info(f"📊 Size: {info['size']}")
+                    st.caption(f"Modified: {info['modified']}")
+            else:
+                selected_files = st.multiselect("📂 Select Files", file_names,
+                                                default=file_names, key='files_select')
+                if not selected_files:
+                    st.info("💡 Select at least one file")
+                else:
+                    file_paths = [data_files[file_names.index(name)] for name in selected_files]
+                    st.info(f"📊 {len(file_paths)} file(s) will be merged")
         else:
             st.warning(f"⚠️ No files in '{DATA_FOLDER}' folder")
             uploaded = st.file_uploader("📤 Upload File", type=['xlsx', 'xls', 'csv'])
@@ -1239,19 +1153,25 @@ def main():
                 st.success(f"✅ {uploaded.name}")
             else:
                 st.info(f"Create '{DATA_FOLDER}' folder and place files there")
-                return
-    
-    # Load data
-    with st.spinner('⏳ Loading data...'):
-        df, error = load_and_prepare_data(file_path)
-    
-    if error:
-        st.error(f"❌ {error}")
-        return
-    
-    if df is None or len(df) == 0:
-        st.error("❌ No data available")
-        return
+        
+        if st.button("🧹 Purge Cache", key='purge_cache'):
+            removed = purge_data_cache()
+            st.cache_data.clear()
+            get_figure_cache.clear()
+            st.success(f"✅ {removed} cache file(s) removed")
+    
+    source = {'file_path': file_path, 'file_paths': file_paths}
+    changed = st.session_state.get('data_source_id', source_id(source)) != source_id(source)
+    st.session_state['data_source'] = source
+    st.session_state['data_source_id'] = source_id(source)
+    if changed:
+        st.rerun()
+
+@st.fragment
+def render_workspace(df, cube, sketches, filter_index, dataset_key, view_columns, data_files):
+    """Sidebar filters and the dashboard body. Filter and view changes rerun
+    only this fragment; the source scan, loading and styling are not repeated"""
+    filters = {}
     
     # Sidebar Filters
     with st.sidebar:
@@ -1259,15 +1179,15 @@ def main():
         st.title("🔍 Filters")
         
         # Kabupaten Filter
-        kab_opts = ['All'] + sorted([str(k) for k in df['Kabupaten / Kota'].unique() if pd.notna(k)])
+        kab_opts = ['All'] + [str(k) for k in filter_options(filter_index, 'Kabupaten / Kota')]
         sel_kab = st.selectbox("📍 Kabupaten", kab_opts, key='kab_filter')
         
-        df_filtered = df.copy()
         if sel_kab != 'All':
-            df_filtered = df_filtered[df_filtered['Kabupaten / Kota'] == sel_kab]
+            filters['kabupaten'] = sel_kab
+        dates = filter_options(filter_index, 'Tanggal_Only', filter_positions(filter_index, filters))
         
         # MULTI-DATE FILTER (NEW!)
-        has_date = 'Tanggal_Only' in df_filtered.columns and df_filtered['Tanggal_Only'].notna().any()
+        has_date = len(dates) > 0
         
         if has_date:
             st.markdown("**📅 Date Filter** ⭐ **Multi-Select!**")
@@ -1280,7 +1200,6 @@ def main():
             )
             
             if date_filter_mode == "Date Range":
-                dates = sorted(df_filtered['Tanggal_Only'].dropna().unique())
                 min_date = min(dates)
                 max_date = max(dates)
                 
@@ -1290,17 +1209,12 @@ def main():
                 with col2:
                     end_date = st.date_input("To", max_date, key='end_date')
                 
-                df_filtered = df_filtered[
-                    (df_filtered['Tanggal_Only'] >= start_date) & 
-                    (df_filtered['Tanggal_Only'] <= end_date)
-                ]
+                filters['date_range'] = (start_date, end_date)
                 
                 days_diff = (end_date - start_date).days + 1
                 st.success(f"✅ {days_diff} days selected")
             
             elif date_filter_mode == "Multiple Dates":
-                dates = sorted(df_filtered['Tanggal_Only'].dropna().unique())
-                
                 selected_dates = st.multiselect(
                     "Select Dates:",
                     dates,
@@ -1309,34 +1223,53 @@ def main():
                 )
                 
                 if selected_dates:
-                    df_filtered = df_filtered[df_filtered['Tanggal_Only'].isin(selected_dates)]
+                    filters['dates'] = selected_dates
                     st.success(f"✅ {len(selected_dates)} date(s) selected")
                 else:
                     st.info("💡 Select at least one date")
         
         # Location Filter
-        lok_opts = ['All'] + sorted([str(l) for l in df_filtered['Lokasi Pengukuran'].unique() if pd.notna(l)])
+        lok_opts = ['All'] + [str(l) for l in filter_options(
+            filter_index, 'Lokasi Pengukuran', filter_positions(filter_index, filters))]
         sel_lok = st.selectbox("📍 Location", lok_opts, key='loc_filter')
         if sel_lok != 'All':
-            df_filtered = df_filtered[df_filtered['Lokasi Pengukuran'] == sel_lok]
+            filters['location'] = sel_lok
         
         # Operator Filter
         op_opts = ['All'] + sorted(ALLOWED_OPERATORS)
         sel_ops = st.multiselect("👥 Operators", op_opts, default='All', key='op_filter')
         if 'All' not in sel_ops and sel_ops:
-            df_filtered = df_filtered[df_filtered['Operator'].isin(sel_ops)]
+            filters['operators'] = sel_ops
+        
+        # Rate Aggregation
+        rate_mode = st.radio("⚖️ Success/Bad Rates", RATE_MODES, key='rate_mode', horizontal=True,
+                             help="Sample-Weighted sums attempts/samples per group for exact rates")
+        
+        cube_filtered = apply_filters(cube, filters)
+        sketches_filtered = apply_filters(sketches, filters)
+        df_filtered = take_rows(df, filter_positions(filter_index, filters))
+        view_key = (dataset_key, filter_signature(filters))
         
         st.markdown("---")
         
         # Summary Stats
         col1, col2 = st.columns(2)
-        col1.metric("📊 Records", f"{len(df_filtered):,}")
-        col2.metric("📍 Locations", df_filtered['Lokasi Pengukuran'].nunique())
+        col1.metric("📊 Records", f"{int(cube_filtered[RECORDS_COLUMN].sum()):,}")
+        col2.metric("📍 Locations", cube_filtered['Lokasi Pengukuran'].nunique())
         
-        if has_date and not df_filtered.empty:
+        if has_date and not cube_filtered.empty:
             col1, col2 = st.columns(2)
-            col1.metric("📅 Dates", f"{df_filtered['Tanggal_Only'].nunique()}")
-            col2.metric("👥 Operators", df_filtered['Operator'].nunique())
+            col1.metric("📅 Dates", f"{cube_filtered['Tanggal_Only'].nunique()}")
+            col2.metric("👥 Operators", cube_filtered['Operator'].nunique())
+        
+        memory = get_memory_report(df, dataset_key)
+        if memory['columns']:
+            st.caption(f"💾 Categorical encoding: {memory['categorical_bytes'] / 1024:.0f} KB "
+                       f"vs {memory['object_bytes'] / 1024:.0f} KB as text "
+                       f"(saved {memory['saved_bytes'] / 1024:.0f} KB)")
+        
+        # Level of detail for the location charts
+        detail = chart_detail_controls(cube_filtered['Lokasi Pengukuran'].nunique())
     
     if df_filtered.empty:
         st.warning("⚠️ No data matches the selected filters")
@@ -1348,24 +1281,92 @@ def main():
     # Dashboard Mode Selection
     dashboard_mode = st.radio(
         "📡 **Select Dashboard View**",
-        ["📶 2G Analysis", "📡 4G Analysis", "📋 Kesimpulan 2G", "📋 Kesimpulan 4G"],
+        DASHBOARD_VIEWS,
         horizontal=True,
         key='dashboard_mode'
     )
     
+    # A view reading other columns needs the data reloaded with its projection
+    if VIEW_COLUMNS.get(dashboard_mode) != view_columns:
+        st.rerun()
+    
     st.markdown("---")
     
     if dashboard_mode == "📶 2G Analysis":
-        render_2g_dashboard_enhanced(df_filtered)
+        render_2g_dashboard_enhanced(df_filtered, cube_filtered, sketches_filtered, view_key, rate_mode, detail)
     
     elif dashboard_mode == "📡 4G Analysis":
-        render_4g_dashboard(df_filtered)
+        render_4g_dashboard(df_filtered, cube_filtered, sketches_filtered, view_key, rate_mode, detail)
     
     elif dashboard_mode == "📋 Kesimpulan 2G":
-        render_conclusions_menu(df_filtered, tech='2G')
+        render_conclusions_menu(cube_filtered, view_key, tech='2G')
     
     elif dashboard_mode == "📋 Kesimpulan 4G":
-        render_conclusions_menu(df_filtered, tech='4G')
+        render_conclusions_menu(cube_filtered, view_key, tech='4G')
+    
+    elif dashboard_mode in REGISTRY_VIEWS:
+        render_registry_dashboard(df_filtered, cube_filtered, view_key, REGISTRY_VIEWS[dashboard_mode], detail)
+    
+    elif dashboard_mode == "📈 Perbandingan Periode":
+        # Each period brings its own dates, so only the non-date filters apply
+        render_period_comparison(data_files, {k: v for k, v in filters.items() if k not in ('date_range', 'dates')},
+                                 detail)
+    
+    # Figure cache effectiveness, counted after this run's charts were served
+    figure_cache = get_figure_cache()
+    st.sidebar.caption(f"🖼️ Figure cache: {figure_cache['hits']} hits / {figure_cache['misses']} misses "
+                       f"({len(figure_cache['figures'])}/{FIGURE_CACHE_SIZE} figures)")
+
+def main():
+    st.markdown('<p class="main-header">📡 QoS Dashboard v2.0 - Enhanced</p>', unsafe_allow_html=True)
+    
+    data_files = get_data_files(DATA_FOLDER)
+    render_data_source(data_files)
+    if st.session_state.get('data_source_id') is None:
+        return
+    source = st.session_state['data_source']
+    file_path, file_paths = source['file_path'], source['file_paths']
+    
+    # Load only the columns the active view reads; the view radio is drawn
+    # further down, its current value is already in session state
+    active_view = st.session_state.get('dashboard_mode', DASHBOARD_VIEWS[0])
+    view_columns = VIEW_COLUMNS.get(active_view)
+    
+    # Load data
+    with st.spinner('⏳ Loading data...'):
+        if file_paths:
+            cache_keys = tuple(get_cache_key(f) for f in file_paths)
+            df, file_errors = load_selected_files(tuple(file_paths), cache_keys, view_columns)
+            for file_error in file_errors:
+                st.warning(f"⚠️ {file_error}")
+            error = None if df is not None else "; ".join(file_errors)
+            dataset_key = (cache_keys, view_columns)
+            sources = tuple(zip(file_paths, cache_keys)) if all(cache_keys) else ()
+        elif isinstance(file_path, str):
+            cache_key = get_cache_key(file_path)
+            df, error = load_and_prepare_data(file_path, cache_key, view_columns)
+            dataset_key = (cache_key or file_path, view_columns)
+            sources = ((file_path, cache_key),) if cache_key else ()
+        else:
+            cache_key = get_upload_cache_key(file_path)
+            df, error = load_uploaded_data(file_path, cache_key, view_columns)
+            dataset_key = (cache_key, view_columns)
+            sources = ()
+    
+    if error:
+        st.error(f"❌ {error}")
+        return
+    
+    if df is None or len(df) == 0:
+        st.error("❌ No data available")
+        return
+    
+    # Option lists come from the filter index and summaries from the metric
+    # cube; the raw rows are taken once, after every filter is known
+    summary = get_dataset_summary(df, dataset_key, sources)
+    cube, sketches = summary['cube'], summary['sketches']
+    filter_index = get_filter_index(df, dataset_key)
+    render_workspace(df, cube, sketches, filter_index, dataset_key, view_columns, data_files)
     
     # Footer
     st.markdown("---")
@@ -0,0 +1,1265 @@
+"""
+QoS Analytics Core
+Metric registry, thresholds, scoring, quality categories and conclusion
+generators for 2G-5G, voice and messaging measurements. Pure pandas/numpy so it can be used by the
+dashboard, the batch CLI and worker processes alike.
+"""
+
+import pandas as pd
+import numpy as np
+from functools import lru_cache
+
+# ===== THRESHOLDS =====
+# 2G Thresholds
+THRESHOLDS_2G = {
+    'RxLev': {'excellent': -75, 'good': -85, 'fair': -95},
+    'RxQual': {'excellent': 2, 'good': 4, 'fair': 5}
+}
+
+# 4G Thresholds
+THRESHOLDS_4G = {
+    'RSRP': {'excellent': -80, 'good': -90, 'fair': -100},
+    'Speed': {'excellent': 30, 'good': 15, 'fair': 5},
+    'Percentage': {'excellent': 95, 'good': 85, 'fair': 70}
+}
+
+# 5G Thresholds
+THRESHOLDS_5G = {
+    'SS-RSRP': {'excellent': -80, 'good': -90, 'fair': -100},
+    'SS-SINR': {'excellent': 20, 'good': 13, 'fair': 0}
+}
+
+# 3G Thresholds
+THRESHOLDS_3G = {
+    'RSCP': {'excellent': -70, 'good': -85, 'fair': -100},
+    'EcIo': {'excellent': -6, 'good': -10, 'fair': -15}
+}
+
+# Voice Thresholds (CST and drop rate: lower is better)
+THRESHOLDS_VOICE = {
+    'MOS': {'excellent': 4.0, 'good': 3.5, 'fair': 3.0},
+    'CST': {'excellent': 5, 'good': 8, 'fair': 13},
+    'Drop': {'excellent': 1, 'good': 2, 'fair': 5}
+}
+
+# ===== METRIC REGISTRY =====
+# One entry per metric column: technology, label, unit, quality profile
+# (thresholds and direction, see QUALITY_THRESHOLDS) and score weight.
+# points: score per band Excellent/Good/Fair/Poor, default DEFAULT_POINTS.
+# Adding a metric, or a whole technology, only takes entries here.
+DEFAULT_POINTS = (100, 75, 50, 25)
+RATE_POINTS = (100, 75, 50, 50)  # success rates only distinguish three levels
+
+METRIC_REGISTRY = {
+    'Average SS-RSRP (Signal Strenght 5G)': {'tech': '5G', 'label': 'SS-RSRP', 'unit': 'dBm', 'quality': 'ss_rsrp', 'weight': 0.6},
+    'Average SS-SINR (Signal Qualty 5G)': {'tech': '5G', 'label': 'SS-SINR', 'unit': 'dB', 'quality': 'ss_sinr', 'weight': 0.4},
+    'Average RSRP (Signal Strenght 4G)': {'tech': '4G', 'label': 'RSRP', 'unit': 'dBm', 'quality': 'rsrp', 'weight': 0.3},
+    'Average Speed Test DL (Mbps) (4G)': {'tech': '4G', 'label': 'Download Speed', 'unit': 'Mbps', 'quality': 'speed', 'weight': 0.3},
+    'Average Speed Test UL (Mbps) (4G)': {'tech': '4G', 'label': 'Upload Speed', 'unit': 'Mbps', 'quality': 'speed', 'weight': 0.0},
+    'Browsing Success (%)': {'tech': '4G', 'label': 'Browsing Success Rate', 'unit': '%', 'quality': 'percentage', 'weight': 0.2, 'points': RATE_POINTS},
+    'Youtube SR (%)': {'tech': '4G', 'label': 'YouTube Success Rate', 'unit': '%', 'quality': 'percentage', 'weight': 0.2, 'points': RATE_POINTS},
+    'Average RSCP (Signal Strenght 3G)': {'tech': '3G', 'label': 'RSCP', 'unit': 'dBm', 'quality': 'rscp', 'weight': 0.6},
+    'Average ECIO (Signal Quality 3G)': {'tech': '3G', 'label': 'Ec/Io', 'unit': 'dB', 'quality': 'ecio', 'weight': 0.4},
+    'Average RxLev (2G)': {'tech': '2G', 'label': 'RxLev', 'unit': 'dBm', 'quality': 'rxlev', 'weight': 1.0},
+    'Average RxQual (2G)': {'tech': '2G', 'label': 'RxQual', 'unit': '', 'quality': 'rxqual', 'weight': 1.0},
+    'Success Call (%)': {'tech': 'Voice', 'label': 'Call Success Rate', 'unit': '%', 'quality': 'percentage', 'weight': 0.4, 'points': RATE_POINTS},
+    'Dropped Call (%)': {'tech': 'Voice', 'label': 'Drop Call Rate', 'unit': '%', 'quality': 'drop_rate', 'weight': 0.2},
+    'Average MOS': {'tech': 'Voice', 'label': 'MOS', 'unit': '', 'quality': 'mos', 'weight': 0.3},
+    'Average CST': {'tech': 'Voice', 'label': 'Call Setup Time', 'unit': 's', 'quality': 'cst', 'weight': 0.1},
+    'WA Call Success (%)': {'tech': 'WhatsApp', 'label': 'WA Call Success Rate', 'unit': '%', 'quality': 'percentage', 'weight': 0.4, 'points': RATE_POINTS},
+    'WA Call Average MOS': {'tech': 'WhatsApp', 'label': 'WA Call MOS', 'unit': '', 'quality': 'mos', 'weight': 0.3},
+    'WA Message Send Success (%)': {'tech': 'WhatsApp', 'label': 'WA Message Success Rate', 'unit': '%', 'quality': 'percentage', 'weight': 0.3, 'points': RATE_POINTS},
+    'SMS Receive< 1 Minutes (Onnet) (%)': {'tech': 'SMS', 'label': 'SMS < 1 Min (Onnet)', 'unit': '%', 'quality': 'percentage', 'weight': 0.5, 'points': RATE_POINTS},
+    'SMS Receive (%) < 1 Minutes (Offnet)': {'tech': 'SMS', 'label': 'SMS < 1 Min (Offnet)', 'unit': '%', 'quality': 'percentage', 'weight': 0.5, 'points': RATE_POINTS}
+}
+
+REGISTRY_TECHS = list(dict.fromkeys(spec['tech'] for spec in METRIC_REGISTRY.values()))
+
+def registry_columns(tech):
+    """Registered metric columns of a technology, in registry order"""
+    return tuple(col for col, spec in METRIC_REGISTRY.items() if spec['tech'] == tech)
+
+# Metric columns read per technology with conclusion generators
+TECH_COLUMNS = {
+    '2G': registry_columns('2G'),
+    '4G': registry_columns('4G')
+}
+
+# Rate column -> (numerator count, denominator count) it was computed from.
+# Summing the counts gives exact rates for any grouping; averaging the
+# per-row percentages does not
+RATE_COUNTS = {
+    'Bad SS-RSRP (%) (5G)': ('Bad SS-RSRP Sample (5G)', 'Total SS-RSRP Sample (5G)'),
+    'Bad SS-SINR (%) (5G)': ('Bad SS-SINR Sample (5G)', 'Total SS-SINR Sample (5G)'),
+    'Bad RSRP (%) (4G)': ('Bad RSRP Sample (4G)', 'Total RSRP Sample (4G)'),
+    'Bad RSRQ (%) (4G)': ('Bad RSRQ Sample (4G)', 'Total RSRQ Sample (4G)'),
+    'Bad SINR (%) (4G)': ('Bad SINR Sample (4G)', 'Total SINR Sample (4G)'),
+    'Bad RSCP (%) (3G)': ('Bad RSCP Sample (3G)', 'Total RSCP Sample (3G)'),
+    'Bad EcIo (%) (3G)': ('Bad EcIo Sample (3G)', 'Total EcIo Sample (3G)'),
+    'Bad RxLev (%) (2G)': ('Bad RxLev Sample (2G)', 'Total RxLev Sample (2G)'),
+    'Bad RxQual (%) (2G)': ('Bad RxQual Sample (2G)', 'Total RxQual Sample (2G)'),
+    'FTP DL Success (%)': ('FTP DL Success Attempts', 'FTP DL Attempts'),
+    'FTP UL Success (%)': ('FTP UL Success Attempts', 'FTP UL Attempts'),
+    'Browsing Success (%)': ('Browsing Success Attemps', 'Browsing Attemps'),
+    'Speed Test DL Success (%)': ('Speed Test Success Attemps', 'Speed Test Attemps'),
+    'Ping Success (%)': ('Ping Success Attemps', 'Ping Attemps'),
+    'Youtube SR (%)': ('Video Success Attempts', 'Video Attempts'),
+    'WA Call Blocked (%)': ('WA Call Blocked', 'WA Call Attempts'),
+    'WA Call Dropped (%)': ('WA Call Dropped', 'WA Call Attempts'),
+    'Blocked Call (%)': ('Blocked Call', 'Call Attempts'),
+    'Dropped Call (%)': ('Dropped Call', 'Call Attempts')
+}
+
+# Rates shown per technology
+TECH_RATES = {
+    '2G': ('Bad RxLev (%) (2G)', 'Bad RxQual (%) (2G)'),
+    '4G': ('Bad RSRP (%) (4G)', 'Bad RSRQ (%) (4G)', 'Bad SINR (%) (4G)', 'Browsing Success (%)',
+           'Youtube SR (%)', 'FTP DL Success (%)', 'FTP UL Success (%)', 'Ping Success (%)'),
+    '5G': ('Bad SS-RSRP (%) (5G)', 'Bad SS-SINR (%) (5G)'),
+    '3G': ('Bad RSCP (%) (3G)', 'Bad EcIo (%) (3G)'),
+    'Voice': ('Blocked Call (%)', 'Dropped Call (%)'),
+    'WhatsApp': ('WA Call Blocked (%)', 'WA Call Dropped (%)')
+}
+
+def rate_count_columns(rates):
+    """Numerator and denominator columns behind the given rates"""
+    return [col for rate in rates for col in RATE_COUNTS[rate]]
+
+# ===== HELPER FUNCTIONS =====
+def safe_agg(series, func='mean'):
+    try:
+        if func == 'mean':
+            return series.mean() if series.notna().any() else np.nan
+        elif func == 'min':
+            return series.min() if series.notna().any() else np.nan
+        elif func == 'max':
+            return series.max() if series.notna().any() else np.nan
+        elif func == 'median':
+            return series.median() if series.notna().any() else np.nan
+        else:
+            return np.nan
+    except:
+        return np.nan
+
+def concat_aligned(frames):
+    """Concatenate frames whose categorical columns may have different
+    categories, keeping them categorical over the sorted union of labels"""
+    frames = list(frames)
+    categorical = {col for frame in frames for col in frame.columns
+                   if isinstance(frame[col].dtype, pd.CategoricalDtype)}
+    for col in categorical:
+        labels = set()
+        for frame in frames:
+            if col in frame.columns:
+                series = frame[col]
+                labels.update(series.cat.categories if isinstance(series.dtype, pd.CategoricalDtype) else series.dropna().unique())
+        dtype = pd.CategoricalDtype(sorted(labels, key=str))
+        frames = [frame.assign(**{col: frame[col].astype(dtype)}) if col in frame.columns else frame for frame in frames]
+    return pd.concat(frames, ignore_index=True)
+
+# ===== VECTORIZED SCORING =====
+QUALITY_LABELS = np.array(["Excellent", "Good", "Fair", "Poor"])
+QUALITY_CLASSES = np.array(["quality-excellent", "quality-good", "quality-fair", "quality-poor"])
+
+# metric_type (quality profile) -> (thresholds, higher_is_better)
+QUALITY_THRESHOLDS = {
+    'rxlev': (THRESHOLDS_2G['RxLev'], True),
+    'rxqual': (THRESHOLDS_2G['RxQual'], False),
+    'rsrp': (THRESHOLDS_4G['RSRP'], True),
+    'speed': (THRESHOLDS_4G['Speed'], True),
+    'percentage': (THRESHOLDS_4G['Percentage'], True),
+    'ss_rsrp': (THRESHOLDS_5G['SS-RSRP'], True),
+    'ss_sinr': (THRESHOLDS_5G['SS-SINR'], True),
+    'rscp': (THRESHOLDS_3G['RSCP'], True),
+    'ecio': (THRESHOLDS_3G['EcIo'], True),
+    'mos': (THRESHOLDS_VOICE['MOS'], True),
+    'cst': (THRESHOLDS_VOICE['CST'], False),
+    'drop_rate': (THRESHOLDS_VOICE['Drop'], False)
+}
+
+def higher_is_better(col):
+    """Whether larger values of a metric column are better (True when unregistered)"""
+    spec = METRIC_REGISTRY.get(col)
+    return QUALITY_THRESHOLDS[spec['quality']][1] if spec else True
+
+SCORE_BADGE_CUTS = [85, 70, 50]
+SCORE_BADGE_CLASSES = np.array(["quality-excellent", "quality-good", "quality-fair", "quality-poor"])
+SCORE_BADGE_LABELS = np.array(["Sangat Baik", "Baik", "Cukup", "Perlu Perbaikan"])
+
+@lru_cache(maxsize=None)
+def compile_bands(profiles):
+    """Band tables for a tuple of quality profiles (QUALITY_THRESHOLDS keys).
+    
+    Values and cut points are sign-flipped for lower-is-better profiles, so
+    every band test is `value >= cut` over the cuts (fair, good, excellent).
+    """
+    signs = np.array([1.0 if QUALITY_THRESHOLDS[profile][1] else -1.0 for profile in profiles])
+    cuts = np.array([[QUALITY_THRESHOLDS[profile][0][band] for band in ('fair', 'good', 'excellent')]
+                     for profile in profiles], dtype='float64').reshape(len(profiles), 3)
+    return {'signs': signs, 'cuts': cuts * signs[:, None]}
+
+@lru_cache(maxsize=None)
+def compile_registry(tech):
+    """Registry entries of a technology as arrays for band_matrix and score_matrix"""
+    columns = registry_columns(tech)
+    specs = [METRIC_REGISTRY[col] for col in columns]
+    return {
+        **compile_bands(tuple(spec['quality'] for spec in specs)),
+        'columns': columns,
+        'weights': np.array([spec['weight'] for spec in specs], dtype='float64'),
+        'points': np.array([spec.get('points', DEFAULT_POINTS) for spec in specs], dtype='float64').reshape(len(specs), 4)
+    }
+
+def scored_columns(tech):
+    """Registered columns of a technology that carry a score weight"""
+    return tuple(col for col in registry_columns(tech) if METRIC_REGISTRY[col]['weight'] > 0)
+
+def band_matrix(values, compiled):
+    """Bands (0 Excellent .. 3 Poor, -1 missing) for a rows x metrics value matrix"""
+    values = np.asarray(values, dtype='float64')
+    passed = (values * compiled['signs'])[:, :, None] >= compiled['cuts'][None, :, :]
+    return np.where(np.isnan(values), -1, 3 - passed.sum(axis=2))
+
+def score_matrix(bands, compiled):
+    """Weighted score per row from a band matrix; weights renormalised over available metrics.
+    
+    Rows with no weighted metric available score 0.
+    """
+    available = bands >= 0
+    earned = compiled['points'][np.arange(bands.shape[1]), bands.clip(0)]
+    weights = np.where(available, compiled['weights'], 0.0)
+    total = (earned * weights).sum(axis=1)
+    used = weights.sum(axis=1)
+    return np.divide(total, used, out=np.zeros_like(total), where=used > 0)
+
+def registry_matrix(table, tech, stat=None):
+    """Rows x registered metrics of a technology, read from plain columns or
+    "col [stat]" columns of a table; absent metrics are NaN"""
+    names = [col if stat is None else f"{col} [{stat}]" for col in registry_columns(tech)]
+    if not names:
+        return np.empty((len(table), 0))
+    return np.column_stack([table[name].to_numpy(dtype='float64', na_value=np.nan) if name in table.columns
+                            else np.full(len(table), np.nan) for name in names])
+
+def score_table(table, tech, stat=None):
+    """Score per row of a table holding a technology's registered metrics"""
+    compiled = compile_registry(tech)
+    return score_matrix(band_matrix(registry_matrix(table, tech, stat), compiled), compiled)
+
+def quality_band(values, metric_type):
+    """Band index per value: 0 Excellent, 1 Good, 2 Fair, 3 Poor, -1 missing"""
+    values = np.asarray(values, dtype='float64').reshape(-1, 1)
+    return band_matrix(values, compile_bands((metric_type,)))[:, 0]
+
+def categorize_quality_array(values, metric_type):
+    """Vectorized categorize_quality: (labels, css classes) arrays"""
+    bands = quality_band(values, metric_type)
+    labels = np.where(bands < 0, "No Data", QUALITY_LABELS[bands.clip(0)])
+    classes = np.where(bands < 0, "quality-poor", QUALITY_CLASSES[bands.clip(0)])
+    return labels, classes
+
+def categorize_quality(value, metric_type):
+    """Categorize signal quality based on value and type"""
+    if pd.isna(value):
+        return "No Data", "quality-poor"
+    if metric_type not in QUALITY_THRESHOLDS:
+        return "Unknown", "quality-poor"
+    band = quality_band([value], metric_type)[0]
+    return str(QUALITY_LABELS[band]), str(QUALITY_CLASSES[band])
+
+def calculate_2g_score_array(rxlev, rxqual):
+    return score_table(pd.DataFrame(dict(zip(scored_columns('2G'), (rxlev, rxqual)))), '2G')
+
+def calculate_4g_score_array(rsrp, speed_dl, browsing_sr, youtube_sr):
+    return score_table(pd.DataFrame(dict(zip(scored_columns('4G'), (rsrp, speed_dl, browsing_sr, youtube_sr)))), '4G')
+
+def calculate_2g_score(rxlev, rxqual):
+    """Calculate 2G performance score (0-100)"""
+    return float(calculate_2g_score_array([rxlev], [rxqual])[0])
+
+def calculate_4g_score(rsrp, speed_dl, browsing_sr, youtube_sr):
+    """Calculate 4G performance score (0-100) with weights"""
+    return float(calculate_4g_score_array([rsrp], [speed_dl], [browsing_sr], [youtube_sr])[0])
+
+def get_score_badge_array(scores):
+    """Vectorized get_score_badge: (css classes, labels) arrays"""
+    scores = np.asarray(scores, dtype='float64')
+    bands = np.select([scores >= cut for cut in SCORE_BADGE_CUTS], [0, 1, 2], default=3)
+    return SCORE_BADGE_CLASSES[bands], SCORE_BADGE_LABELS[bands]
+
+def get_score_badge(score):
+    """Get score badge class and label"""
+    classes, labels = get_score_badge_array([score])
+    return str(classes[0]), str(labels[0])
+
+def score_rows(df_data, tech):
+    """Per-row score Series for a technology (NaN-safe, 0 when no metric)"""
+    return pd.Series(score_table(df_data, tech), index=df_data.index, name=f"Score {tech}")
+
+def location_scores(df_data, tech, by=('Lokasi Pengukuran', 'Operator'), cube=None):
+    """Mean metrics and score per group, scored in one vectorized pass.
+    
+    The score is computed from the group means, matching the per-location
+    scores shown in the conclusions. With a metric cube the means are
+    rolled up from it instead of the raw rows.
+    """
+    columns = scored_columns(tech)
+    metric_cols = [col for col in columns if col in df_data.columns]
+    if cube is not None:
+        rolled = rollup_cube(cube, by, metric_cols).set_index(list(by))
+        table = rolled[[f"{col} [mean]" for col in metric_cols]]
+        table.columns = metric_cols
+        sizes = rolled[RECORDS_COLUMN].astype('int64')
+    else:
+        grouped = df_data.groupby(list(by), observed=True)
+        sizes = grouped.size()
+        if metric_cols:
+            table = grouped[metric_cols].mean()
+        else:
+            table = pd.DataFrame(index=sizes.index)
+    table = table.reindex(columns=list(columns))
+    table[f"Score {tech}"] = score_table(table, tech)
+    table['Measurements'] = sizes
+    return table.dropna(axis=1, how='all').reset_index()
+
+# ===== QUALITY DISTRIBUTION =====
+# Metrics with a band histogram per technology: (column, metric_type)
+DISTRIBUTION_METRICS = {
+    tech: [(col, METRIC_REGISTRY[col]['quality']) for col in registry_columns(tech)]
+    for tech in REGISTRY_TECHS
+}
+
+def quality_distribution(df_data, tech, by='Operator'):
+    """Excellent/Good/Fair/Poor counts per group and metric.
+    
+    Rows are banded once per metric and counted for every group in a
+    single bincount. Returns one row per (group, metric) with the band
+    counts and `Total` (non-missing values).
+    """
+    groups, keys = pd.factorize(df_data[by], sort=True)
+    keys = np.asarray(keys, dtype=object)
+    tables = []
+    for col, metric_type in DISTRIBUTION_METRICS[tech]:
+        if col not in df_data.columns:
+            continue
+        bands = quality_band(df_data[col].to_numpy(dtype='float64', na_value=np.nan), metric_type)
+        valid = (bands >= 0) & (groups >= 0)
+        counts = np.bincount(groups[valid] * 4 + bands[valid], minlength=len(keys) * 4)
+        table = pd.DataFrame(counts.reshape(len(keys), 4), columns=QUALITY_LABELS)
+        table.insert(0, by, keys)
+        table.insert(1, 'Metric', col)
+        tables.append(table)
+    if not tables:
+        return pd.DataFrame(columns=[by, 'Metric'] + list(QUALITY_LABELS) + ['Total'])
+    distribution = pd.concat(tables, ignore_index=True)
+    distribution['Total'] = distribution[list(QUALITY_LABELS)].sum(axis=1)
+    return distribution
+
+# ===== REGISTRY EVALUATOR =====
+def evaluate_cube(cube, tech, by=()):
+    """Stats, quality band and score for every registered metric of a technology.
+    
+    One cube rollup, one broadcast band test and one weighted sum, whatever
+    the number of metrics. Returns `by` plus "col [mean|min|max|count]",
+    "col [quality]" and "Score {tech}" per group.
+    """
+    compiled = compile_registry(tech)
+    columns = compiled['columns']
+    rolled = rollup_cube(cube, by, columns)
+    bands = band_matrix(registry_matrix(rolled, tech, 'mean'), compiled)
+    
+    table = rolled[list(by)].copy()
+    for i, col in enumerate(columns):
+        if f"{col} [mean]" not in rolled.columns:
+            continue
+        for stat in ('mean', 'min', 'max', 'count'):
+            table[f"{col} [{stat}]"] = rolled[f"{col} [{stat}]"]
+        table[f"{col} [quality]"] = np.where(bands[:, i] < 0, "No Data", QUALITY_LABELS[bands[:, i].clip(0)])
+    table[f"Score {tech}"] = score_matrix(bands, compiled)
+    table[RECORDS_COLUMN] = rolled[RECORDS_COLUMN].astype('int64')
+    return table
+
+# ===== METRIC CUBE =====
+# Grain of the pre-aggregated cube; filters and rollups only ever touch these
+CUBE_DIMENSIONS = ['Operator', 'Kabupaten / Kota', 'Lokasi Pengukuran', 'Tanggal_Only']
+CUBE_STATS = ('count', 'sum', 'sumsq', 'min', 'max')
+RECORDS_COLUMN = 'Records'
+LOCATIONS_COLUMN = 'Locations'
+FIRST_DATE_COLUMN = 'First Date'
+LAST_DATE_COLUMN = 'Last Date'
+
+# Every registered metric and per-technology rate, as stored in dataset and per-file cubes
+CUBE_METRICS = list(dict.fromkeys(list(METRIC_REGISTRY) + [rate for rates in TECH_RATES.values() for rate in rates]))
+
+def cube_metrics(cube):
+    """Metric names stored in a cube"""
+    return [col[:-len(' [count]')] for col in cube.columns if col.endswith(' [count]')]
+
+def cube_rates(cube):
+    """Sample-weighted rates stored in a cube"""
+    return [col[:-len(' [den]')] for col in cube.columns if col.endswith(' [den]')]
+
+def build_metric_cube(df_data, metrics, rates=()):
+    """Count/sum/sum of squares/min/max per metric at the cube grain.
+    
+    For each rate whose count columns are present, the numerator and
+    denominator are summed as "rate [num]"/"rate [den]" over rows where both
+    are known. Rows with missing dimension values are kept in their own
+    cells so record counts still add up to the raw frame.
+    """
+    dims = [col for col in CUBE_DIMENSIONS if col in df_data.columns]
+    metrics = [col for col in metrics if col in df_data.columns]
+    values = df_data[metrics].astype('float64')
+    keys = [df_data[col] for col in dims]
+    grouped = values.groupby(keys, observed=True, dropna=False, sort=False)
+    
+    parts = [
+        grouped.count().add_suffix(' [count]'),
+        grouped.sum().add_suffix(' [sum]'),
+        (values ** 2).groupby(keys, observed=True, dropna=False, sort=False).sum().add_suffix(' [sumsq]'),
+        grouped.min().add_suffix(' [min]'),
+        grouped.max().add_suffix(' [max]')
+    ]
+    counts = {}
+    for rate in rates:
+        numerator, denominator = RATE_COUNTS[rate]
+        if numerator in df_data.columns and denominator in df_data.columns:
+            num = df_data[numerator].astype('float64')
+            den = df_data[denominator].astype('float64')
+            known = num.notna() & den.notna()
+            counts[f"{rate} [num]"] = num.where(known)
+            counts[f"{rate} [den]"] = den.where(known)
+    if counts:
+        parts.append(pd.DataFrame(counts).groupby(keys, observed=True, dropna=False, sort=False).sum())
+    cube = pd.concat(parts, axis=1)
+    cube[RECORDS_COLUMN] = grouped.size()
+    return cube.reset_index()
+
+def rollup_cube(cube, by=(), metrics=None, dropna=True):
+    """Roll cube cells up to `by` (all cells when empty) with mean/std/min/max per metric.
+    
+    Distinct locations are added as `Locations` unless grouping by location,
+    and the measurement period as `First Date`/`Last Date`. Rolled-up frames
+    keep the cube columns, so they can be rolled up again.
+    """
+    by = list(by)
+    metrics = cube_metrics(cube) if metrics is None else [m for m in metrics if f"{m} [count]" in cube.columns]
+    agg = {RECORDS_COLUMN: 'sum'}
+    for metric in metrics:
+        agg.update({f"{metric} [count]": 'sum', f"{metric} [sum]": 'sum', f"{metric} [sumsq]": 'sum',
+                    f"{metric} [min]": 'min', f"{metric} [max]": 'max'})
+    rates = cube_rates(cube)
+    for rate in rates:
+        agg.update({f"{rate} [num]": 'sum', f"{rate} [den]": 'sum'})
+    if 'Tanggal_Only' in cube.columns and 'Tanggal_Only' not in by:
+        dates = pd.to_datetime(cube['Tanggal_Only'])
+        cube = cube.assign(**{FIRST_DATE_COLUMN: dates, LAST_DATE_COLUMN: dates})
+    if FIRST_DATE_COLUMN in cube.columns:
+        agg.update({FIRST_DATE_COLUMN: 'min', LAST_DATE_COLUMN: 'max'})
+    count_location = 'Lokasi Pengukuran' in cube.columns and 'Lokasi Pengukuran' not in by
+    
+    if by:
+        grouped = cube.groupby(by, observed=True, dropna=dropna)
+        rolled = grouped[list(agg)].agg(agg)
+        if count_location:
+            rolled[LOCATIONS_COLUMN] = grouped['Lokasi Pengukuran'].nunique()
+        rolled = rolled.reset_index()
+    else:
+        rolled = pd.DataFrame({col: [getattr(cube[col], func)()] for col, func in agg.items()})
+        if count_location:
+            rolled[LOCATIONS_COLUMN] = cube['Lokasi Pengukuran'].nunique()
+    
+    for metric in metrics:
+        count = rolled[f"{metric} [count]"]
+        total = rolled[f"{metric} [sum]"]
+        rolled[f"{metric} [mean]"] = (total / count).where(count > 0)
+        variance = ((rolled[f"{metric} [sumsq]"] - total ** 2 / count) / (count - 1)).where(count > 1)
+        rolled[f"{metric} [std]"] = np.sqrt(variance.clip(lower=0))
+    for rate in rates:
+        denominator = rolled[f"{rate} [den]"]
+        rolled[f"{rate} [weighted]"] = (rolled[f"{rate} [num]"] / denominator * 100).where(denominator > 0)
+    return rolled
+
+def rate_table(cube, by, rates):
+    """Sample-weighted rate, row-average rate and sample count per group.
+    
+    The row average is only available for rates also stored as cube metrics.
+    """
+    rates = [rate for rate in rates if f"{rate} [den]" in cube.columns]
+    rolled = rollup_cube(cube, by, [rate for rate in rates if f"{rate} [count]" in cube.columns])
+    table = rolled[list(by)].copy()
+    for rate in rates:
+        table[f"{rate} [weighted]"] = rolled[f"{rate} [weighted]"]
+        if f"{rate} [mean]" in rolled.columns:
+            table[f"{rate} [row avg]"] = rolled[f"{rate} [mean]"]
+        table[f"{rate} [samples]"] = rolled[f"{rate} [den]"].astype('int64')
+    return table
+
+def cube_means(cube, by, metrics=None):
+    """Per-group metric means under the plain metric names, like groupby().mean()"""
+    rolled = rollup_cube(cube, by, metrics)
+    metrics = [col[:-len(' [mean]')] for col in rolled.columns if col.endswith(' [mean]')]
+    means = rolled[list(by) + [f"{m} [mean]" for m in metrics]]
+    return means.rename(columns={f"{m} [mean]": m for m in metrics})
+
+def apply_filters(frame, filters):
+    """Rows of a raw frame or metric cube matching the sidebar filters, in one mask.
+    
+    filters: kabupaten, date_range (start, end), dates, location, operators;
+    missing or empty entries do not filter.
+    """
+    mask = np.ones(len(frame), dtype=bool)
+    if filters.get('kabupaten'):
+        mask &= (frame['Kabupaten / Kota'] == filters['kabupaten']).to_numpy(dtype=bool)
+    if filters.get('date_range'):
+        start_date, end_date = filters['date_range']
+        dates = frame['Tanggal_Only']
+        mask &= ((dates >= start_date) & (dates <= end_date)).to_numpy(dtype=bool)
+    if filters.get('dates'):
+        mask &= frame['Tanggal_Only'].isin(filters['dates']).to_numpy(dtype=bool)
+    if filters.get('location'):
+        mask &= (frame['Lokasi Pengukuran'] == filters['location']).to_numpy(dtype=bool)
+    if filters.get('operators'):
+        mask &= frame['Operator'].isin(filters['operators']).to_numpy(dtype=bool)
+    return frame if mask.all() else frame[mask]
+
+def operator_rollup(cube, operators, metrics=None):
+    """Cube rollup per operator, one row for each requested operator"""
+    stats = rollup_cube(cube, ['Operator'], metrics).set_index('Operator')
+    stats.index = stats.index.astype(str)
+    stats = stats.reindex([str(op) for op in operators])
+    return stats.fillna({RECORDS_COLUMN: 0, LOCATIONS_COLUMN: 0})
+
+# ===== QUANTILE SKETCHES =====
+# Values are binned at SKETCH_RESOLUTION. When a metric would need more than
+# SKETCH_MAX_BINS distinct bins, adjacent bin pairs are merged (Scale + 1
+# doubles the width) until it fits, so a sketch holds at most that many bins
+# per metric and cell whatever the value range. Quantiles are read at bin
+# centres: approximate, within half a bin width (0.005 at Scale 0) of
+# Series.quantile on the raw values.
+SKETCH_RESOLUTION = 0.01
+SKETCH_MAX_BINS = 2048
+SKETCH_QUANTILES = {'P10': 0.1, 'Median': 0.5, 'P90': 0.9}
+
+def compact_sketches(sketches, max_bins=SKETCH_MAX_BINS):
+    """Bring each metric's rows to one Scale and coarsen until <= max_bins bins remain.
+    
+    Only Bin/Scale are rewritten; callers sum Count over the coarsened keys.
+    """
+    if sketches.empty:
+        return sketches
+    metric = sketches['Metric']
+    scale = sketches.groupby('Metric', observed=True)['Scale'].transform('max').to_numpy()
+    bins = pd.Series(sketches['Bin'].to_numpy() >> (scale - sketches['Scale'].to_numpy()), index=sketches.index)
+    extra = pd.Series(0, index=metric.unique())
+    while True:
+        shift = extra.reindex(metric).to_numpy()
+        distinct = (bins >> shift).groupby(metric, observed=True).nunique()
+        over = distinct.index[distinct > max_bins]
+        if len(over) == 0:
+            break
+        extra[over] += 1
+    return sketches.assign(Bin=bins.to_numpy() >> shift, Scale=scale + shift)
+
+def build_quantile_sketches(df_data, metrics, max_bins=SKETCH_MAX_BINS):
+    """Sparse value histograms per cube cell and metric (Bin = value / bin width).
+    
+    Sketches merge by summing Count per (group, Metric, Scale, Bin), so they
+    roll up across dates, locations and files like the metric cube.
+    """
+    dims = [col for col in CUBE_DIMENSIONS if col in df_data.columns]
+    keys = dims + ['Metric', 'Scale', 'Bin']
+    tables = []
+    for metric in [m for m in metrics if m in df_data.columns]:
+        values = df_data[metric].to_numpy(dtype='float64', na_value=np.nan)
+        valid = ~np.isnan(values)
+        cells = df_data[dims].iloc[np.flatnonzero(valid)]
+        cells = cells.assign(Bin=np.round(values[valid] / SKETCH_RESOLUTION).astype('int64'))
+        counts = cells.groupby(dims + ['Bin'], observed=True, dropna=False, sort=False).size()
+        counts = counts.rename('Count').reset_index()
+        counts.insert(len(dims), 'Metric', metric)
+        counts.insert(len(dims) + 1, 'Scale', 0)
+        tables.append(counts)
+    if not tables:
+        return pd.DataFrame(columns=keys + ['Count'])
+    sketches = compact_sketches(pd.concat(tables, ignore_index=True), max_bins)
+    sketches['Metric'] = sketches['Metric'].astype('category')
+    return sketches.groupby(keys, observed=True, dropna=False, sort=False)['Count'].sum().reset_index()
+
+def merge_sketches(*sketches, by=(), dropna=True):
+    """Combine sketches (e.g. from several files) into one per `by` group"""
+    combined = compact_sketches(concat_aligned(sketches))
+    grouped = combined.groupby(list(by) + ['Metric', 'Scale', 'Bin'], observed=True, dropna=dropna)
+    return grouped.agg(Count=('Count', 'sum')).reset_index()
+
+def sketch_quantiles(sketches, by=(), quantiles=SKETCH_QUANTILES):
+    """Quantiles per group and metric, read off merged sketches.
+    
+    Uses the same linear interpolation between order statistics as
+    pandas' Series.quantile, applied to bin centres (see the section note).
+    """
+    keys = list(by) + ['Metric']
+    merged = merge_sketches(sketches, by=by)
+    if merged.empty:
+        return pd.DataFrame(columns=keys + list(quantiles))
+    grouped = merged.groupby(keys, observed=True, sort=False)['Count']
+    end = grouped.cumsum().to_numpy()
+    start = end - merged['Count'].to_numpy()
+    total = grouped.transform('sum').to_numpy()
+    group_id = grouped.ngroup().to_numpy()
+    width = 2.0 ** merged['Scale'].to_numpy(dtype='float64')
+    values = (merged['Bin'].to_numpy(dtype='float64') * width + (width - 1) / 2) * SKETCH_RESOLUTION
+    
+    result = merged.loc[start == 0, keys].reset_index(drop=True)
+    first_rows = np.flatnonzero(start == 0)
+    for name, q in quantiles.items():
+        position = q * (total - 1)
+        lower, upper = np.floor(position), np.ceil(position)
+        value_lower = np.zeros(len(first_rows))
+        value_upper = np.zeros(len(first_rows))
+        in_lower = (start <= lower) & (lower < end)
+        in_upper = (start <= upper) & (upper < end)
+        value_lower[group_id[in_lower]] = values[in_lower]
+        value_upper[group_id[in_upper]] = values[in_upper]
+        fraction = (position - lower)[first_rows]
+        result[name] = value_lower + (value_upper - value_lower) * fraction
+    return result
+
+# ===== FILE SUMMARIES =====
+# Additive aggregates of one file: its metric cube and quantile sketches.
+# qos_data persists them next to the cached frame; they merge exactly
+# across files and appended rows, so neither is rebuilt from all rows
+SUMMARY_COLUMNS = CUBE_METRICS + rate_count_columns(RATE_COUNTS)
+SUMMARY_PARTS = ('cube', 'sketches')
+
+def merge_cubes(*cubes):
+    """Combine metric cubes (e.g. of several files) cell by cell"""
+    combined = concat_aligned(cubes)
+    dims = [col for col in CUBE_DIMENSIONS if col in combined.columns]
+    values = [col for col in combined.columns if col not in dims]
+    mins = [col for col in values if col.endswith(' [min]')]
+    maxs = [col for col in values if col.endswith(' [max]')]
+    sums = [col for col in values if col not in mins and col not in maxs]
+    grouped = combined.groupby(dims, observed=True, dropna=False, sort=False)
+    merged = pd.concat([grouped[sums].sum(), grouped[mins].min(), grouped[maxs].max()], axis=1)
+    return merged[values].reset_index()
+
+def build_file_summary(df_data):
+    """Metric cube and quantile sketches of one file's prepared rows"""
+    return {'cube': build_metric_cube(df_data, CUBE_METRICS, RATE_COUNTS),
+            'sketches': build_quantile_sketches(df_data, list(METRIC_REGISTRY))}
+
+def merge_file_summaries(*summaries):
+    """One summary for several files (or a file and its appended rows)"""
+    cube = merge_cubes(*[summary['cube'] for summary in summaries])
+    dims = [col for col in CUBE_DIMENSIONS if col in cube.columns]
+    sketches = merge_sketches(*[summary['sketches'] for summary in summaries], by=dims, dropna=False)
+    return {'cube': cube, 'sketches': sketches}
+
+# How qos_data builds, merges and stores file summaries
+FILE_SUMMARY = {'build': build_file_summary, 'merge': merge_file_summaries,
+                'columns': SUMMARY_COLUMNS, 'parts': SUMMARY_PARTS}
+
+# ===== FILTER INDEX =====
+# Sidebar filter -> column it indexes
+FILTER_COLUMNS = {
+    'kabupaten': 'Kabupaten / Kota',
+    'dates': 'Tanggal_Only',
+    'location': 'Lokasi Pengukuran',
+    'operators': 'Operator'
+}
+
+def build_filter_index(df_data):
+    """Sorted row positions per value of every filter column, built once per dataset.
+    
+    Per column: `values` (sorted distinct values, which double as the option
+    list), `codes` (value code per row, -1 when missing), and `order`/`bounds`
+    so rows of value code c are order[bounds[c]:bounds[c + 1]], ascending.
+    """
+    index = {'rows': len(df_data), 'columns': {}}
+    for col in FILTER_COLUMNS.values():
+        if col not in df_data.columns:
+            continue
+        codes, values = pd.factorize(df_data[col].to_numpy(dtype=object), sort=True)
+        order = np.argsort(codes, kind='stable')
+        bounds = np.searchsorted(codes[order], np.arange(len(values) + 1))
+        index['columns'][col] = {
+            'values': list(values),
+            'lookup': {value: code for code, value in enumerate(values)},
+            'codes': codes,
+            'order': order,
+            'bounds': bounds
+        }
+    return index
+
+def _code_range_positions(entry, first, last):
+    """Sorted row positions for value codes first..last-1"""
+    positions = entry['order'][entry['bounds'][first]:entry['bounds'][last]]
+    return positions if last - first <= 1 else np.sort(positions)
+
+def _value_positions(entry, values):
+    """Sorted row positions holding any of the given values"""
+    codes = [entry['lookup'][value] for value in values if value in entry['lookup']]
+    if len(codes) == 1:
+        return _code_range_positions(entry, codes[0], codes[0] + 1)
+    parts = [entry['order'][entry['bounds'][code]:entry['bounds'][code + 1]] for code in codes]
+    return np.sort(np.concatenate(parts)) if parts else np.empty(0, dtype=np.intp)
+
+def filter_positions(index, filters):
+    """Row positions matching the filters, intersected from the index.
+    
+    Same filter keys as apply_filters; None when nothing is filtered.
+    """
+    columns = index['columns']
+    found = []
+    if filters.get('kabupaten') and FILTER_COLUMNS['kabupaten'] in columns:
+        found.append(_value_positions(columns[FILTER_COLUMNS['kabupaten']], [filters['kabupaten']]))
+    if filters.get('date_range') and FILTER_COLUMNS['dates'] in columns:
+        entry = columns[FILTER_COLUMNS['dates']]
+        start_date, end_date = filters['date_range']
+        first = int(np.searchsorted(entry['values'], start_date, side='left'))
+        last = int(np.searchsorted(entry['values'], end_date, side='right'))
+        found.append(_code_range_positions(entry, first, max(first, last)))
+    if filters.get('dates') and FILTER_COLUMNS['dates'] in columns:
+        found.append(_value_positions(columns[FILTER_COLUMNS['dates']], filters['dates']))
+    if filters.get('location') and FILTER_COLUMNS['location'] in columns:
+        found.append(_value_positions(columns[FILTER_COLUMNS['location']], [filters['location']]))
+    if filters.get('operators') and FILTER_COLUMNS['operators'] in columns:
+        found.append(_value_positions(columns[FILTER_COLUMNS['operators']], filters['operators']))
+    
+    if not found:
+        return None
+    positions = found[0]
+    for other in found[1:]:
+        positions = np.intersect1d(positions, other, assume_unique=True)
+    return positions
+
+def filter_options(index, col, positions=None):
+    """Sorted distinct values of a column among the given rows (all rows when None)"""
+    entry = index['columns'].get(col)
+    if entry is None:
+        return []
+    if positions is None:
+        return list(entry['values'])
+    codes = np.unique(entry['codes'][positions])
+    return [entry['values'][code] for code in codes if code >= 0]
+
+def take_rows(df_data, positions):
+    """Single positional take of the filtered rows.
+    
+    positions must be in row order, as from filter_positions; a full set
+    then means every row and the frame is returned without a copy.
+    """
+    if positions is None or len(positions) == len(df_data):
+        return df_data
+    return df_data.iloc[positions]
+
+def sorted_positions(df_data, col, ascending=True):
+    """Row positions ordered by one column, stable and with missing values last"""
+    codes, values = pd.factorize(df_data[col].to_numpy(dtype=object), sort=True)
+    keys = np.where(codes < 0, len(values), codes) if ascending else np.where(codes < 0, 1, -codes)
+    return np.argsort(keys, kind='stable')
+
+def search_positions(df_data, positions, col, query):
+    """Positions whose value in col contains query (case-insensitive), order kept"""
+    if not query:
+        return positions
+    matches = df_data[col].astype('string').str.contains(query, case=False, regex=False, na=False)
+    return positions[matches.to_numpy(dtype=bool)[positions]]
+
+# ===== PERIOD COMPARISON =====
+# Metrics compared between periods, next to the technology score
+COMPARISON_METRICS = {
+    '2G': ('Average RxLev (2G)', 'Average RxQual (2G)'),
+    '4G': ('Average RSRP (Signal Strenght 4G)', 'Average Speed Test DL (Mbps) (4G)', 'Youtube SR (%)')
+}
+PERIOD_COLUMN = 'Period'
+
+def period_windows(cube, freq='W'):
+    """Split a cube into calendar windows ({label: cells}, oldest first).
+    
+    freq is a pandas period alias: 'W' for weeks, 'M' for months.
+    """
+    periods = pd.to_datetime(cube['Tanggal_Only']).dt.to_period(freq)
+    windows = {}
+    for period, cells in cube.groupby(periods, sort=True):
+        if freq == 'M':
+            label = period.start_time.strftime('%b %Y')
+        else:
+            label = f"{period.start_time:%d/%m} - {period.end_time:%d/%m/%Y}"
+        windows[label] = cells
+    return windows
+
+def order_periods(periods):
+    """Periods sorted by their first measurement date (undated ones last)"""
+    def start(cube):
+        if 'Tanggal_Only' not in cube.columns:
+            return pd.Timestamp.max
+        first = pd.to_datetime(cube['Tanggal_Only']).min()
+        return pd.Timestamp.max if pd.isna(first) else first
+    return dict(sorted(periods.items(), key=lambda item: start(item[1])))
+
+def compare_periods(periods, tech, by=('Operator',)):
+    """Comparison metric means and technology score per group and period.
+    
+    periods: {label: cube} in period order, e.g. one per-file summary per
+    file or the output of period_windows. Returns a long table with `by`,
+    Period, the metrics under their registry labels, Score {tech} and Records.
+    """
+    by = list(by)
+    labels = {f"{col} [mean]": METRIC_REGISTRY[col]['label'] for col in COMPARISON_METRICS[tech]}
+    score = f"Score {tech}"
+    frames = []
+    for period, cube in periods.items():
+        if cube.empty:
+            continue
+        evaluated = evaluate_cube(cube, tech, by)
+        frame = evaluated.reindex(columns=by + list(labels) + [score, RECORDS_COLUMN]).rename(columns=labels)
+        frame.loc[frame[list(labels.values())].isna().all(axis=1), score] = np.nan
+        # Category dictionaries differ between files
+        frame[by] = frame[by].astype(str)
+        frame.insert(len(by), PERIOD_COLUMN, period)
+        frames.append(frame)
+    if not frames:
+        return pd.DataFrame(columns=by + [PERIOD_COLUMN] + list(labels.values()) + [score, RECORDS_COLUMN])
+    return pd.concat(frames, ignore_index=True)
+
+def period_deltas(comparison, by=('Operator',)):
+    """One row per group: every value per period ("col [period]") and its
+    change from the first to the last period ("col [Δ]")"""
+    by = list(by)
+    values = [col for col in comparison.columns if col not in by + [PERIOD_COLUMN, RECORDS_COLUMN]]
+    periods = list(dict.fromkeys(comparison[PERIOD_COLUMN]))
+    if not periods:
+        return pd.DataFrame(columns=by)
+    wide = comparison.pivot(index=by, columns=PERIOD_COLUMN, values=values)
+    table = pd.DataFrame(index=wide.index)
+    for col in values:
+        for period in periods:
+            table[f"{col} [{period}]"] = wide[(col, period)]
+        table[f"{col} [Δ]"] = wide[(col, periods[-1])] - wide[(col, periods[0])]
+    return table.reset_index()
+
+# ===== CONCLUSION GENERATORS =====
+CONCLUSION_KEYS = ['Operator', 'Lokasi Pengukuran']
+
+def conclusion_stats(cube, metrics):
+    """One stats row per (operator, location), rolled up from the cube in one groupby.
+    
+    Every conclusion figure (period, coverage, means, ranges, per-location
+    scores) is derived from this small table.
+    """
+    return rollup_cube(cube, CONCLUSION_KEYS, metrics, dropna=False)
+
+def _period_date(value):
+    """Timestamp from a rollup back to a plain date (NaN when missing)"""
+    return value.date() if pd.notna(value) else np.nan
+
+def _stats_score(stats, tech):
+    """Score of one conclusion_stats rollup row, from its "col [mean]" values"""
+    return float(score_table(stats.to_frame().T, tech, 'mean')[0])
+
+def generate_overall_conclusion_2g(df_data, operators, stats=None):
+    """Generate overall 2G conclusion for all operators (from a conclusion_stats table)"""
+    if stats is None:
+        stats = conclusion_stats(build_metric_cube(df_data, TECH_COLUMNS['2G']), TECH_COLUMNS['2G'])
+    overall = rollup_cube(stats).iloc[0]
+    lines = []
+    lines.append("## 📊 **Kesimpulan Pengukuran 2G - Overall**")
+    lines.append("")
+    lines.append(f"**📅 Periode Analisis:** {_period_date(overall[FIRST_DATE_COLUMN])} s/d {_period_date(overall[LAST_DATE_COLUMN])}")
+    lines.append(f"**📍 Total Lokasi:** {int(overall[LOCATIONS_COLUMN])} lokasi")
+    lines.append(f"**📊 Total Pengukuran:** {int(overall[RECORDS_COLUMN])} records")
+    lines.append("")
+    lines.append("---")
+    
+    operator_scores = {}
+    operator_details = {}
+    operator_stats = operator_rollup(stats, operators)
+    rxlev_col, rxqual_col = scored_columns('2G')
+    
+    for operator in operators:
+        op_stats = operator_stats.loc[str(operator)]
+        
+        rxlev = op_stats.get(f"{rxlev_col} [mean]", np.nan)
+        rxqual = op_stats.get(f"{rxqual_col} [mean]", np.nan)
+        
+        score = _stats_score(op_stats, '2G')
+        operator_scores[operator] = score
+        operator_details[operator] = {'rxlev': rxlev, 'rxqual': rxqual}
+        
+        lines.append("")
+        lines.append(f"### 👤 **{operator}**")
+        lines.append("")
+        
+        # Signal Metrics
+        if pd.notna(rxlev):
+            cat, cls = categorize_quality(rxlev, METRIC_REGISTRY[rxlev_col]['quality'])
+            lines.append(f"**📶 RxLev (Signal Strength):** {rxlev:.2f} dBm - <span class='{cls}'>{cat}</span>")
+        
+        if pd.notna(rxqual):
+            cat, cls = categorize_quality(rxqual, METRIC_REGISTRY[rxqual_col]['quality'])
+            lines.append(f"**📡 RxQual (Signal Quality):** {rxqual:.2f} - <span class='{cls}'>{cat}</span>")
+        
+        # Coverage Stats
+        lines.append(f"**📍 Coverage:** {int(op_stats[LOCATIONS_COLUMN])} locations, {int(op_stats[RECORDS_COLUMN])} measurements")
+        
+        # Overall Score
+        badge_cls, badge_label = get_score_badge(score)
+        lines.append("")
+        lines.append(f"**📊 Overall Score:** <span class='{badge_cls} style='padding: 0.5rem 1rem;'>{badge_label} ({score:.0f}/100)</span>")
+        lines.append("")
+        lines.append("---")
+    
+    # Ranking
+    if operator_scores:
+        lines.append("")
+        lines.append("## 🏆 **Ranking 2G Performance**")
+        lines.append("")
+        
+        sorted_ops = sorted(operator_scores.items(), key=lambda x: x[1], reverse=True)
+        for rank, (op, score) in enumerate(sorted_ops, 1):
+            medal = "🥇" if rank == 1 else "🥈" if rank == 2 else "🥉"
+            badge = " <span class='best-badge'>TERBAIK 2G</span>" if rank == 1 else ""
+            details = operator_details[op]
+            
+            lines.append(f"{medal} **{rank}. {op}**{badge}")
+            lines.append(f"   - Overall Score: {score:.0f}/100")
+            lines.append(f"   - RxLev: {details['rxlev']:.2f} dBm | RxQual: {details['rxqual']:.2f}")
+            lines.append("")
+    
+    return "\n".join(lines)
+
+def generate_overall_conclusion_4g(df_data, operators, stats=None):
+    """Generate overall 4G conclusion for all operators (from a conclusion_stats table)"""
+    if stats is None:
+        stats = conclusion_stats(build_metric_cube(df_data, TECH_COLUMNS['4G']), TECH_COLUMNS['4G'])
+    overall = rollup_cube(stats).iloc[0]
+    lines = []
+    lines.append("## 📊 **Kesimpulan Pengukuran 4G - Overall**")
+    lines.append("")
+    lines.append(f"**📅 Periode Analisis:** {_period_date(overall[FIRST_DATE_COLUMN])} s/d {_period_date(overall[LAST_DATE_COLUMN])}")
+    lines.append(f"**📍 Total Lokasi:** {int(overall[LOCATIONS_COLUMN])} lokasi")
+    lines.append(f"**📊 Total Pengukuran:** {int(overall[RECORDS_COLUMN])} records")
+    lines.append("")
+    lines.append("---")
+    
+    operator_scores = {}
+    operator_details = {}
+    operator_stats = operator_rollup(stats, operators)
+    rsrp_col, speed_col, browsing_col, youtube_col = scored_columns('4G')
+    
+    for operator in operators:
+        op_stats = operator_stats.loc[str(operator)]
+        
+        rsrp = op_stats.get(f"{rsrp_col} [mean]", np.nan)
+        speed_dl = op_stats.get(f"{speed_col} [mean]", np.nan)
+        browsing = op_stats.get(f"{browsing_col} [mean]", np.nan)
+        youtube = op_stats.get(f"{youtube_col} [mean]", np.nan)
+        
+        score = _stats_score(op_stats, '4G')
+        operator_scores[operator] = score
+        operator_details[operator] = {
+            'rsrp': rsrp, 'speed': speed_dl, 
+            'browsing': browsing, 'youtube': youtube
+        }
+        
+        lines.append("")
+        lines.append(f"### 👤 **{operator}**")
+        lines.append("")
+        
+        # Metrics
+        if pd.notna(rsrp):
+            cat, cls = categorize_quality(rsrp, METRIC_REGISTRY[rsrp_col]['quality'])
+            lines.append(f"**📡 RSRP:** {rsrp:.2f} dBm - <span class='{cls}'>{cat}</span>")
+        
+        if pd.notna(speed_dl):
+            cat, cls = categorize_quality(speed_dl, METRIC_REGISTRY[speed_col]['quality'])
+            lines.append(f"**🚀 Download Speed:** {speed_dl:.2f} Mbps - <span class='{cls}'>{cat}</span>")
+        
+        if pd.notna(browsing):
+            cat, cls = categorize_quality(browsing, METRIC_REGISTRY[browsing_col]['quality'])
+            lines.append(f"**🌐 Browsing SR:** {browsing:.1f}% - <span class='{cls}'>{cat}</span>")
+        
+        if pd.notna(youtube):
+            cat, cls = categorize_quality(youtube, METRIC_REGISTRY[youtube_col]['quality'])
+            lines.append(f"**📹 YouTube SR:** {youtube:.1f}% - <span class='{cls}'>{cat}</span>")
+        
+        # Coverage
+        lines.append(f"**📍 Coverage:** {int(op_stats[LOCATIONS_COLUMN])} locations, {int(op_stats[RECORDS_COLUMN])} measurements")
+        
+        # Score
+        badge_cls, badge_label = get_score_badge(score)
+        lines.append("")
+        lines.append(f"**📊 Overall Score:** <span class='{badge_cls} style='padding: 0.5rem 1rem;'>{badge_label} ({score:.0f}/100)</span>")
+        lines.append("")
+        lines.append("---")
+    
+    # Ranking
+    if operator_scores:
+        lines.append("")
+        lines.append("## 🏆 **Ranking 4G Performance**")
+        lines.append("")
+        
+        sorted_ops = sorted(operator_scores.items(), key=lambda x: x[1], reverse=True)
+        for rank, (op, score) in enumerate(sorted_ops, 1):
+            medal = "🥇" if rank == 1 else "🥈" if rank == 2 else "🥉"
+            badge = " <span class='best-badge'>TERBAIK 4G</span>" if rank == 1 else ""
+            details = operator_details[op]
+            
+            lines.append(f"{medal} **{rank}. {op}**{badge}")
+            lines.append(f"   - Overall Score: {score:.0f}/100")
+            lines.append(f"   - RSRP: {details['rsrp']:.2f} dBm | Speed: {details['speed']:.2f} Mbps")
+            lines.append(f"   - Browsing: {details['browsing']:.1f}% | YouTube: {details['youtube']:.1f}%")
+            lines.append("")
+    
+    return "\n".join(lines)
+
+def generate_per_operator_conclusion_2g(df_data, operator, stats=None):
+    """Generate detailed 2G conclusion for specific operator (from a conclusion_stats table)"""
+    if stats is None:
+        stats = conclusion_stats(build_metric_cube(df_data, TECH_COLUMNS['2G']), TECH_COLUMNS['2G'])
+    lines = []
+    lines.append(f"## 📊 **Kesimpulan 2G - {operator}**")
+    lines.append("")
+    
+    op_locations = stats[stats['Operator'] == operator]
+    op_stats = rollup_cube(op_locations).iloc[0]
+    rxlev_col, rxqual_col = scored_columns('2G')
+    
+    lines.append(f"**📅 Periode:** {_period_date(op_stats[FIRST_DATE_COLUMN])} s/d {_period_date(op_stats[LAST_DATE_COLUMN])}")
+    lines.append(f"**📍 Total Lokasi:** {int(op_stats[LOCATIONS_COLUMN])}")
+    lines.append(f"**📊 Total Measurements:** {int(op_stats[RECORDS_COLUMN])}")
+    lines.append("")
+    lines.append("---")
+    
+    # Overall Metrics
+    lines.append("### 📈 **Overall Performance**")
+    lines.append("")
+    
+    if f"{rxlev_col} [mean]" in op_stats.index:
+        rxlev_avg = op_stats[f"{rxlev_col} [mean]"]
+        rxlev_min = op_stats[f"{rxlev_col} [min]"]
+        rxlev_max = op_stats[f"{rxlev_col} [max]"]
+        
+        if pd.notna(rxlev_avg):
+            cat, cls = categorize_quality(rxlev_avg, METRIC_REGISTRY[rxlev_col]['quality'])
+            lines.append(f"**📶 RxLev (Signal Strength):**")
+            lines.append(f"- Average: {rxlev_avg:.2f} dBm - <span class='{cls}'>{cat}</span>")
+            lines.append(f"- Range: {rxlev_min:.2f} to {rxlev_max:.2f} dBm")
+            lines.append("")
+    
+    if f"{rxqual_col} [mean]" in op_stats.index:
+        rxqual_avg = op_stats[f"{rxqual_col} [mean]"]
+        rxqual_min = op_stats[f"{rxqual_col} [min]"]
+        rxqual_max = op_stats[f"{rxqual_col} [max]"]
+        
+        if pd.notna(rxqual_avg):
+            cat, cls = categorize_quality(rxqual_avg, METRIC_REGISTRY[rxqual_col]['quality'])
+            lines.append(f"**📡 RxQual (Signal Quality):**")
+            lines.append(f"- Average: {rxqual_avg:.2f} - <span class='{cls}'>{cat}</span>")
+            lines.append(f"- Range: {rxqual_min:.2f} to {rxqual_max:.2f}")
+            lines.append("")
+    
+    # Location Analysis
+    lines.append("---")
+    lines.append("### 📍 **Per Location Summary**")
+    lines.append("")
+    
+    # First 5 locations by label, as in the per-location groupby this replaced
+    location_stats = op_locations.dropna(subset=['Lokasi Pengukuran']).sort_values(
+        'Lokasi Pengukuran', key=lambda labels: labels.astype(str), kind='stable')
+    for _, loc_stats in location_stats.head(5).iterrows():  # Top 5 locations
+        loc = loc_stats['Lokasi Pengukuran']
+        rxlev_loc = loc_stats.get(f"{rxlev_col} [mean]", np.nan)
+        rxqual_loc = loc_stats.get(f"{rxqual_col} [mean]", np.nan)
+        
+        score_loc = _stats_score(loc_stats, '2G')
+        badge_cls, badge_label = get_score_badge(score_loc)
+        
+        lines.append(f"**{loc}:**")
+        if pd.notna(rxlev_loc):
+            lines.append(f"- RxLev: {rxlev_loc:.2f} dBm")
+        if pd.notna(rxqual_loc):
+            lines.append(f"- RxQual: {rxqual_loc:.2f}")
+        lines.append(f"- Score: <span class='{badge_cls}'>{score_loc:.0f}/100</span>")
+        lines.append("")
+    
+    if len(location_stats) > 5:
+        lines.append(f"*...dan {len(location_stats) - 5} lokasi lainnya*")
+    
+    # Overall Score
+    score_overall = _stats_score(op_stats, '2G')
+    badge_cls, badge_label = get_score_badge(score_overall)
+    
+    lines.append("")
+    lines.append("---")
+    lines.append(f"### 🎯 **Overall Score: <span class='{badge_cls} style='padding: 0.5rem 1rem;'>{badge_label} ({score_overall:.0f}/100)</span>**")
+    
+    return "\n".join(lines)
+
+def generate_per_operator_conclusion_4g(df_data, operator, stats=None):
+    """Generate detailed 4G conclusion for specific operator (from a conclusion_stats table)"""
+    if stats is None:
+        stats = conclusion_stats(build_metric_cube(df_data, TECH_COLUMNS['4G']), TECH_COLUMNS['4G'])
+    lines = []
+    lines.append(f"## 📊 **Kesimpulan 4G - {operator}**")
+    lines.append("")
+    
+    op_locations = stats[stats['Operator'] == operator]
+    op_stats = rollup_cube(op_locations).iloc[0]
+    rsrp_col, speed_col = scored_columns('4G')[:2]
+    
+    lines.append(f"**📅 Periode:** {_period_date(op_stats[FIRST_DATE_COLUMN])} s/d {_period_date(op_stats[LAST_DATE_COLUMN])}")
+    lines.append(f"**📍 Total Lokasi:** {int(op_stats[LOCATIONS_COLUMN])}")
+    lines.append(f"**📊 Total Measurements:** {int(op_stats[RECORDS_COLUMN])}")
+    lines.append("")
+    lines.append("---")
+    
+    # Overall Metrics
+    lines.append("### 📈 **Overall Performance**")
+    lines.append("")
+    
+    for col in scored_columns('4G'):
+        label, unit, metric_type = (METRIC_REGISTRY[col][key] for key in ('label', 'unit', 'quality'))
+        if f"{col} [mean]" in op_stats.index:
+            val_avg = op_stats[f"{col} [mean]"]
+            val_min = op_stats[f"{col} [min]"]
+            val_max = op_stats[f"{col} [max]"]
+            
+            if pd.notna(val_avg):
+                cat, cls = categorize_quality(val_avg, metric_type)
+                lines.append(f"**{label}:**")
+                lines.append(f"- Average: {val_avg:.2f} {unit} - <span class='{cls}'>{cat}</span>")
+                lines.append(f"- Range: {val_min:.2f} to {val_max:.2f} {unit}")
+                lines.append("")
+    
+    # Location Analysis
+    lines.append("---")
+    lines.append("### 📍 **Per Location Summary**")
+    lines.append("")
+    
+    # First 5 locations by label, as in the per-location groupby this replaced
+    location_stats = op_locations.dropna(subset=['Lokasi Pengukuran']).sort_values(
+        'Lokasi Pengukuran', key=lambda labels: labels.astype(str), kind='stable')
+    for _, loc_stats in location_stats.head(5).iterrows():  # Top 5 locations
+        loc = loc_stats['Lokasi Pengukuran']
+        rsrp_loc = loc_stats.get(f"{rsrp_col} [mean]", np.nan)
+        speed_loc = loc_stats.get(f"{speed_col} [mean]", np.nan)
+        
+        score_loc = _stats_score(loc_stats, '4G')
+        badge_cls, badge_label = get_score_badge(score_loc)
+        
+        lines.append(f"**{loc}:**")
+        if pd.notna(rsrp_loc):
+            lines.append(f"- RSRP: {rsrp_loc:.2f} dBm")
+        if pd.notna(speed_loc):
+            lines.append(f"- DL Speed: {speed_loc:.2f} Mbps")
+        lines.append(f"- Score: <span class='{badge_cls}'>{score_loc:.0f}/100</span>")
+        lines.append("")
+    
+    if len(location_stats) > 5:
+        lines.append(f"*...dan {len(location_stats) - 5} lokasi lainnya*")
+    
+    # Overall Score
+    score_overall = _stats_score(op_stats, '4G')
+    badge_cls, badge_label = get_score_badge(score_overall)
+    
+    lines.append("")
+    lines.append("---")
+    lines.append(f"### 🎯 **Overall Score: <span class='{badge_cls} style='padding: 0.5rem 1rem;'>{badge_label} ({score_overall:.0f}/100)</span>**")
+    
+    return "\n".join(lines)
+
+# ===== AGGREGATE TABLES =====
+AGG_STATS = ['mean', 'min', 'max', 'median', 'count']
+# Column label of a median read off the quantile sketches (approximate)
+APPROX_MEDIAN = 'median~'
+
+def summarize_metrics(df_data, by, columns, stats=AGG_STATS):
+    """Native groupby aggregation of all metric columns at once, as "col [stat]" columns"""
+    columns = [c for c in columns if c in df_data.columns]
+    if not columns:
+        return pd.DataFrame()
+    summary = df_data.groupby(list(by), observed=True)[columns].agg(list(stats))
+    summary.columns = [f"{col} [{stat}]" for col, stat in summary.columns]
+    return summary.reset_index()
+
+def cube_summary(cube, sketches, by, columns, stats=AGG_STATS):
+    """summarize_metrics answered from the metric cube instead of the rows.
+    
+    mean/min/max/count come from one rollup and the median from the merged
+    quantile sketches, so the cost follows the number of cube cells. The
+    sketch median is approximate and labelled "col [median~]".
+    """
+    by = list(by)
+    columns = [c for c in columns if f"{c} [count]" in cube.columns]
+    if not columns:
+        return pd.DataFrame()
+    rolled = rollup_cube(cube, by, columns)
+    if 'median' in stats:
+        medians = sketch_quantiles(sketches, by, {'median': 0.5})
+        medians = medians[medians['Metric'].isin(columns)].pivot(index=by, columns='Metric', values='median')
+        medians.columns = [f"{col} [{APPROX_MEDIAN}]" for col in medians.columns]
+        rolled = rolled.merge(medians.reset_index(), on=by, how='left')
+    summary = rolled[by].copy()
+    for col in columns:
+        for stat in stats:
+            name = f"{col} [{APPROX_MEDIAN if stat == 'median' else stat}]"
+            summary[name] = rolled[name].astype('int64') if stat == 'count' else rolled.get(name, np.nan)
+    return summary
+
+def summary_stat(summary, stat, by=('Lokasi Pengukuran', 'Operator')):
+    """One statistic of a summary under the plain metric names (e.g. for charts)"""
+    suffix = f" [{stat}]"
+    stat_cols = [col for col in summary.columns if col.endswith(suffix)]
+    return summary[list(by) + stat_cols].rename(columns={col: col[:-len(suffix)] for col in stat_cols})
+
+OVERALL_OPERATOR = 'All'
+OPERATOR_STATS = ['mean', 'median', 'P10', 'P90', 'min', 'max', 'count']
+
+def operator_metric_stats(cube, sketches, distribution, metrics):
+    """Per-operator and overall ("All") stats of every metric in one long table.
+    
+    mean/min/max/count come from one cube rollup, median/P10/P90 from the
+    merged quantile sketches and band counts from a quality_distribution
+    table, so the raw rows are not scanned again. One row per (Operator,
+    Metric) with OPERATOR_STATS, band counts, Total, Locations and Records.
+    """
+    columns = ['Operator', 'Metric'] + OPERATOR_STATS + list(QUALITY_LABELS) + ['Total', LOCATIONS_COLUMN, RECORDS_COLUMN]
+    metrics = [m for m in metrics if f"{m} [count]" in cube.columns]
+    if not metrics:
+        return pd.DataFrame(columns=columns)
+    rolled = pd.concat([rollup_cube(cube, ['Operator'], metrics),
+                        rollup_cube(cube, (), metrics).assign(Operator=OVERALL_OPERATOR)], ignore_index=True)
+    rolled['Operator'] = rolled['Operator'].astype(str)
+    tables = []
+    for metric in metrics:
+        table = rolled[['Operator', LOCATIONS_COLUMN, RECORDS_COLUMN]].copy()
+        table.insert(1, 'Metric', metric)
+        for stat in ('mean', 'min', 'max', 'count'):
+            table[stat] = rolled[f"{metric} [{stat}]"]
+        tables.append(table)
+    stats = pd.concat(tables, ignore_index=True)
+    
+    quantiles = pd.concat([sketch_quantiles(sketches, ['Operator']),
+                           sketch_quantiles(sketches).assign(Operator=OVERALL_OPERATOR)], ignore_index=True)
+    quantiles = quantiles.rename(columns={'Median': 'median'}).astype({'Operator': str})
+    bands = distribution.astype({'Operator': str})
+    overall_bands = bands.groupby('Metric', sort=False)[list(QUALITY_LABELS) + ['Total']].sum().reset_index()
+    bands = pd.concat([bands, overall_bands.assign(Operator=OVERALL_OPERATOR)], ignore_index=True)
+    
+    stats = stats.merge(quantiles, on=['Operator', 'Metric'], how='left').merge(bands, on=['Operator', 'Metric'], how='left')
+    counts = list(QUALITY_LABELS) + ['Total']
+    stats[counts] = stats[counts].fillna(0).astype('int64')
+    return stats[columns]
+
+def filter_signature(filters):
+    """Hashable, order-independent form of a filters dict (for cache keys)"""
+    return tuple(sorted((key, tuple(value) if isinstance(value, (list, tuple)) else value)
+                        for key, value in filters.items() if value))
+
+def location_operator_summary(df_data, columns):
+    """Mean/min/max/count per (location, operator) for the given metric columns"""
+    return summarize_metrics(df_data, ['Lokasi Pengukuran', 'Operator'], columns,
+                             ['mean', 'min', 'max', 'count'])
@@ -0,0 +1,181 @@
+"""
+QoS Batch Reports
+Headless entry point that loads one or more data files, generates every
+2G/4G conclusion per kabupaten and operator in a worker pool, and writes
+markdown/HTML reports plus aggregate tables to an output directory.
+
+Usage:
+    python qos_cli.py                          # every file in ./data
+    python qos_cli.py data/week1.xlsx data/week2.csv -o reports --workers 4
+"""
+
+import argparse
+import multiprocessing
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from qos_data import DATA_FOLDER, get_cache_key, get_data_files, load_multiple_files
+from qos_analytics import (
+    TECH_COLUMNS, location_operator_summary,
+    generate_overall_conclusion_2g, generate_overall_conclusion_4g,
+    generate_per_operator_conclusion_2g, generate_per_operator_conclusion_4g
+)
+
+ALL_KABUPATEN = 'All'
+
+HTML_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<style>
+body {{ font-family: Arial, sans-serif; max-width: 960px; margin: 2rem auto; color: #2c3e50; }}
+.quality-excellent, .quality-good, .quality-fair, .quality-poor, .best-badge {{
+    color: white; padding: 0.2rem 0.7rem; border-radius: 20px; font-weight: bold; }}
+.quality-excellent {{ background: #27ae60; }}
+.quality-good {{ background: #2980b9; }}
+.quality-fair {{ background: #e67e22; }}
+.quality-poor {{ background: #c0392b; }}
+.best-badge {{ background: #FFA500; color: #000; }}
+.report {{ white-space: pre-wrap; }}
+</style>
+</head>
+<body>
+{body}
+</body>
+</html>
+"""
+
+# ===== REPORT TASKS =====
+def slugify(text):
+    return re.sub(r'[^A-Za-z0-9]+', '_', str(text)).strip('_') or 'unknown'
+
+def build_tasks(df, techs, kabupatens=None):
+    """Yield one (kabupaten, tech, operator, data, operators) task per report.
+    
+    operator is None for the overall report; data is already reduced to
+    the kabupaten, the tech's columns and (per operator) the operator's rows.
+    """
+    available = sorted(str(k) for k in df['Kabupaten / Kota'].dropna().unique())
+    selected = [k for k in available if not kabupatens or k in kabupatens]
+    for kab in [ALL_KABUPATEN] + selected:
+        subset = df if kab == ALL_KABUPATEN else df[df['Kabupaten / Kota'] == kab]
+        if subset.empty:
+            continue
+        operators = sorted(str(o) for o in subset['Operator'].dropna().unique())
+        for tech in techs:
+            columns = ['Operator', 'Lokasi Pengukuran', 'Tanggal_Only'] + list(TECH_COLUMNS[tech])
+            data = subset[[c for c in columns if c in subset.columns]]
+            yield kab, tech, None, data, operators
+            for operator in operators:
+                yield kab, tech, operator, data[data['Operator'] == operator], operators
+
+def run_task(task):
+    """Generate the markdown for one report task (runs in a worker process)"""
+    kab, tech, operator, data, operators = task
+    if operator is None:
+        generate = generate_overall_conclusion_2g if tech == '2G' else generate_overall_conclusion_4g
+        markdown = generate(data, operators)
+    else:
+        generate = generate_per_operator_conclusion_2g if tech == '2G' else generate_per_operator_conclusion_4g
+        markdown = generate(data, operator)
+    return kab, tech, operator, markdown
+
+def markdown_to_html(markdown_text, title):
+    try:
+        import markdown
+        body = markdown.markdown(markdown_text)
+    except ImportError:
+        body = f"<div class='report'>{markdown_text}</div>"
+    return HTML_TEMPLATE.format(title=title, body=body)
+
+def run_tasks(tasks, workers):
+    if workers <= 1:
+        return [run_task(task) for task in tasks]
+    ctx = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+        chunksize = max(1, len(tasks) // (workers * 4))
+        return list(pool.map(run_task, tasks, chunksize=chunksize))
+
+# ===== OUTPUT =====
+def write_report(output_dir, kab, tech, operator, markdown_text, formats):
+    folder = os.path.join(output_dir, slugify(kab), tech)
+    os.makedirs(folder, exist_ok=True)
+    name = 'overall' if operator is None else slugify(operator)
+    written = []
+    if 'md' in formats:
+        path = os.path.join(folder, f"{name}.md")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(markdown_text)
+        written.append(path)
+    if 'html' in formats:
+        path = os.path.join(folder, f"{name}.html")
+        title = f"QoS {tech} - {kab} - {operator or 'Overall'}"
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(markdown_to_html(markdown_text, title))
+        written.append(path)
+    return written
+
+def write_aggregates(output_dir, df, techs, kabupatens):
+    written = []
+    for kab in kabupatens:
+        subset = df if kab == ALL_KABUPATEN else df[df['Kabupaten / Kota'] == kab]
+        for tech in techs:
+            summary = location_operator_summary(subset, TECH_COLUMNS[tech])
+            if summary.empty:
+                continue
+            folder = os.path.join(output_dir, slugify(kab), tech)
+            os.makedirs(folder, exist_ok=True)
+            path = os.path.join(folder, 'aggregates.csv')
+            summary.to_csv(path, index=False, float_format='%.3f')
+            written.append(path)
+    return written
+
+# ===== ENTRY POINT =====
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Generate QoS conclusions and aggregate tables without Streamlit")
+    parser.add_argument('files', nargs='*', help="Data files (.xlsx/.xls/.csv); default: every file in the data folder")
+    parser.add_argument('--data-folder', default=DATA_FOLDER, help="Folder scanned when no files are given")
+    parser.add_argument('-o', '--output', default='reports', help="Output directory")
+    parser.add_argument('--tech', nargs='+', choices=sorted(TECH_COLUMNS), default=sorted(TECH_COLUMNS))
+    parser.add_argument('--kabupaten', nargs='+', help="Only these Kabupaten / Kota (the 'All' report is always written)")
+    parser.add_argument('--format', nargs='+', choices=['md', 'html'], default=['md', 'html'], dest='formats')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    files = args.files or get_data_files(args.data_folder)
+    if not files:
+        print(f"No data files found in '{args.data_folder}'", file=sys.stderr)
+        return 1
+    
+    columns = [c for tech in args.tech for c in TECH_COLUMNS[tech]]
+    df, errors = load_multiple_files(files, [get_cache_key(f) for f in files],
+                                     max_workers=args.workers, columns=columns)
+    for error in errors:
+        print(f"Warning: {error}", file=sys.stderr)
+    if df is None:
+        return 1
+    
+    techs = [t for t in args.tech if any(c in df.columns for c in TECH_COLUMNS[t])]
+    for tech in sorted(set(args.tech) - set(techs)):
+        print(f"Skipping {tech}: no {tech} columns in the data", file=sys.stderr)
+    
+    tasks = list(build_tasks(df, techs, args.kabupaten))
+    results = run_tasks(tasks, args.workers)
+    
+    written = []
+    for kab, tech, operator, markdown_text in results:
+        written.extend(write_report(args.output, kab, tech, operator, markdown_text, args.formats))
+    kabupatens = list(dict.fromkeys(kab for kab, _, _, _ in results))
+    written.extend(write_aggregates(args.output, df, techs, kabupatens))
+    
+    print(f"{len(df)} records from {len(files)} file(s): "
+          f"{len(results)} reports, {len(written)} files written to '{args.output}'")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,796 @@
+"""
+QoS Data Layer
+File discovery, schema-typed parsing, persistent Parquet cache and
+multi-file ingest. Kept free of Streamlit so it can be imported by
+worker processes and command-line tools.
+"""
+
+import pandas as pd
+import numpy as np
+import os
+import glob
+import hashlib
+import json
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from functools import lru_cache
+from io import BytesIO
+import multiprocessing
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+# ===== CONSTANTS =====
+ALLOWED_OPERATORS = ['Indosat', 'Telkomsel', 'XL']
+DATA_FOLDER = 'data'
+CACHE_FOLDER = '.qos_cache'
+CACHE_VERSION = 3
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+SPOOL_MAX_MEMORY = 8 * 1024 * 1024
+
+# ===== FILE MANAGEMENT =====
+def get_data_files(folder='data'):
+    if not os.path.exists(folder):
+        try:
+            os.makedirs(folder)
+        except:
+            pass
+        return []
+    files = []
+    for ext in ['*.xlsx', '*.xls', '*.csv']:
+        files.extend(glob.glob(os.path.join(folder, ext)))
+    files.sort(key=lambda x: os.path.getmtime(x), reverse=True)
+    return files
+
+def get_file_info(filepath):
+    try:
+        stat = os.stat(filepath)
+        return {
+            'name': os.path.basename(filepath),
+            'size': f"{stat.st_size / (1024 * 1024):.2f} MB",
+            'modified': datetime.fromtimestamp(stat.st_mtime).strftime('%Y-%m-%d %H:%M:%S')
+        }
+    except:
+        return None
+
+# ===== DATA LOADING =====
+NA_TOKENS = ['No Data', 'no data', 'N/A', 'n/a', '-', '', ' ']
+COUNT_KEYWORDS = ['Attempt', 'Attemp', 'Sample', 'Blocked', 'Dropped', 'Send', 'Failed', 'Receive']
+NON_COUNT_KEYWORDS = ['%', 'Average', 'Median', 'Max', 'Min', 'Rank', 'Duration']
+FLOAT64_COLUMNS = ['Lat', 'Long']
+BASE_COLUMNS = ['No.', 'Operator', 'Kabupaten / Kota', 'Lokasi Pengukuran',
+                'Tanggal Pengukuran', 'Tanggal_Only']
+DIMENSION_COLUMNS = ['Operator', 'Kabupaten / Kota', 'Lokasi Pengukuran', 'Zona',
+                     'Kecamatan', 'Desa', 'Jenis Tes', 'POI']
+
+def identify_numeric_columns(columns):
+    keywords = ['Average', 'Median', 'Max', 'Min', 'Success', 'SR', '(%)', 
+                'Speed', 'Mbps', 'RSRP', 'RSRQ', 'SINR', 'Latency', 'RTT',
+                'YouTube', 'Youtube', 'Quality', 'MOS', 'CST', 'Sample',
+                'TTFP', 'Visual', 'Freezing', 'Jerkiness', 'Browsing', 'Ping',
+                'Packet', 'Loss', 'Lat', 'Long', 'RxLev', 'RxQual', '2G']
+    skip = ['No.', 'Zona', 'Kabupaten / Kota', 'Lokasi Pengukuran',
+            'Tanggal Pengukuran', 'Operator', 'Category', 'Jenis Tes']
+    numeric_cols = []
+    for col in columns:
+        if str(col) in skip or str(col).startswith('Category'):
+            continue
+        for kw in keywords:
+            if kw in str(col):
+                numeric_cols.append(col)
+                break
+    return numeric_cols
+
+def is_count_column(col):
+    name = str(col)
+    if any(kw in name for kw in NON_COUNT_KEYWORDS):
+        return False
+    return any(kw in name for kw in COUNT_KEYWORDS)
+
+@lru_cache(maxsize=32)
+def compile_column_schema(columns):
+    """Build the dtype schema for a header tuple (cached per header fingerprint).
+    
+    Returns a dict with the reader `dtype` map, the per-column `na_values`
+    map and the `datetime` columns, so parsing and NA handling happen in
+    the reader instead of in per-column coercion passes.
+    """
+    dtype = {}
+    for col in identify_numeric_columns(columns):
+        dtype[col] = 'float64' if col in FLOAT64_COLUMNS else 'float32'
+    for col in columns:
+        if is_count_column(col):
+            dtype[col] = 'Int32'
+        elif str(col).startswith('Category'):
+            dtype[col] = 'category'
+    na_values = {col: NA_TOKENS for col in dtype}
+    
+    # Dimension labels keep '-' and similar tokens as real values
+    for col in columns:
+        if col in DIMENSION_COLUMNS:
+            dtype[col] = 'category'
+    
+    return {
+        'dtype': dtype,
+        'na_values': na_values,
+        'datetime': [c for c in ['Tanggal Pengukuran'] if c in columns]
+    }
+
+def get_dimension_columns(columns):
+    return [c for c in columns if c in DIMENSION_COLUMNS or str(c).startswith('Category')]
+
+def coerce_column(series, dtype):
+    """Coerce a column that the reader could not type directly"""
+    if dtype == 'category':
+        return series.astype('category')
+    values = pd.to_numeric(series.replace(NA_TOKENS, np.nan), errors='coerce')
+    if dtype == 'Int32':
+        integral = values.dropna()
+        if not (integral == integral.round()).all():
+            return values.astype('float32')
+    return values.astype(dtype)
+
+def apply_column_schema(df, schema):
+    """Coerce only the columns whose dtype does not match the schema"""
+    for col, dtype in schema['dtype'].items():
+        if col in df.columns and str(df[col].dtype) != dtype:
+            try:
+                df[col] = coerce_column(df[col], dtype)
+            except:
+                df[col] = np.nan
+    for col in schema['datetime']:
+        if col in df.columns and not pd.api.types.is_datetime64_any_dtype(df[col]):
+            df[col] = pd.to_datetime(df[col], errors='coerce')
+    return df
+
+def _rewind(file_path):
+    if hasattr(file_path, 'seek'):
+        file_path.seek(0)
+
+def parse_with_schema(reader, schema):
+    """Run a reader with the schema dtypes, falling back to post-parse coercion"""
+    try:
+        df = reader(dtype=schema['dtype'], na_values=schema['na_values'])
+    except (ValueError, TypeError):
+        df = reader(na_values=schema['na_values'])
+    return apply_column_schema(df, schema)
+
+def read_raw_data(file_path, file_ext, columns=None):
+    """Parse an Excel/CSV source into a typed DataFrame.
+    
+    When columns is given only those source columns are parsed (usecols).
+    """
+    usecols = (lambda c: c in columns) if columns is not None else None
+    if file_ext in ('xlsx', 'xls'):
+        engine = 'openpyxl' if file_ext == 'xlsx' else 'xlrd'
+        with pd.ExcelFile(file_path, engine=engine) as xls:
+            sheet = 'Compile_Summary' if 'Compile_Summary' in xls.sheet_names else 0
+            header = xls.parse(sheet, nrows=0).columns
+            schema = compile_column_schema(tuple(header))
+            return parse_with_schema(lambda **kw: xls.parse(sheet, usecols=usecols, **kw), schema)
+    elif file_ext == 'csv':
+        header = pd.read_csv(file_path, encoding='utf-8-sig', nrows=0).columns
+        schema = compile_column_schema(tuple(header))
+        
+        def reader(**kw):
+            _rewind(file_path)
+            return pd.read_csv(file_path, encoding='utf-8-sig', usecols=usecols, **kw)
+        return parse_with_schema(reader, schema)
+    return None
+
+def normalize_object_columns(df):
+    """Store mixed-type text columns as strings so the frame is columnar-safe"""
+    for col in df.columns:
+        if col == 'Tanggal_Only' or df[col].dtype != object:
+            continue
+        mask = df[col].notna()
+        df[col] = df[col].where(~mask, df[col].astype(str))
+    return df
+
+# ===== DIMENSION ENCODING =====
+def encode_dimensions(df, categories=None):
+    """Encode dimension columns as categoricals with sorted string labels.
+    
+    Sorted categories keep groupby and rollup output in label order.
+    categories optionally maps a column to the label list to use, so
+    frames that are concatenated share one category order and keep the
+    categorical dtype (see shared_dimension_categories).
+    """
+    categories = categories or {}
+    for col in get_dimension_columns(df.columns):
+        series = df[col]
+        if not isinstance(series.dtype, pd.CategoricalDtype):
+            series = series.astype('category')
+        labels = series.cat.categories
+        if not all(isinstance(c, str) for c in labels):
+            series = series.cat.rename_categories([str(c) for c in labels])
+        
+        wanted = categories.get(col) or sorted(series.cat.categories)
+        if list(series.cat.categories) != wanted:
+            series = series.cat.set_categories(wanted)
+        df[col] = series
+    return df
+
+def shared_dimension_categories(frames):
+    """Sorted union of the dimension labels of several frames, per column"""
+    labels = {}
+    for df in frames:
+        for col in get_dimension_columns(df.columns):
+            series = df[col]
+            values = series.cat.categories if isinstance(series.dtype, pd.CategoricalDtype) else series.dropna().unique()
+            labels.setdefault(col, set()).update(str(v) for v in values)
+    return {col: sorted(values) for col, values in labels.items()}
+
+def dimension_memory_report(df):
+    """Bytes used by dimension columns as categoricals vs. as object strings"""
+    columns = get_dimension_columns(df.columns)
+    categorical = int(df[columns].memory_usage(deep=True, index=False).sum())
+    as_object = int(sum(df[c].astype(object).memory_usage(deep=True, index=False) for c in columns))
+    return {'columns': len(columns), 'categorical_bytes': categorical,
+            'object_bytes': as_object, 'saved_bytes': as_object - categorical}
+
+def prepare_data(df):
+    """Filter, clean and type a raw QoS frame"""
+    required = ['Operator', 'Kabupaten / Kota', 'Lokasi Pengukuran']
+    missing = [c for c in required if c not in df.columns]
+    if missing:
+        return None, f"Kolom tidak ada: {', '.join(missing)}"
+    
+    df = df[df['Operator'].isin(ALLOWED_OPERATORS)].copy()
+    if len(df) == 0:
+        return None, "Tidak ada data untuk Indosat, Telkomsel, XL"
+    
+    df = df.dropna(subset=['Operator', 'Kabupaten / Kota'])
+    
+    df = apply_column_schema(df, compile_column_schema(tuple(df.columns)))
+    
+    if 'Tanggal Pengukuran' in df.columns:
+        df['Tanggal_Only'] = df['Tanggal Pengukuran'].dt.date
+    
+    df = normalize_object_columns(df)
+    df = encode_dimensions(df)
+    return df.reset_index(drop=True), None
+
+# ===== COLUMN PROJECTION =====
+def resolve_projection(columns):
+    """Full column list for a view: filter/dedupe base columns plus the view's own"""
+    if columns is None:
+        return None
+    return list(dict.fromkeys(BASE_COLUMNS + list(columns)))
+
+def project_frame(df, columns):
+    if columns is None:
+        return df
+    return df[[c for c in columns if c in df.columns]]
+
+def get_file_ext(file_path):
+    if isinstance(file_path, str):
+        return file_path.split('.')[-1].lower()
+    return file_path.name.split('.')[-1].lower()
+
+def load_prepared_frame(file_path, cache_key=None, columns=None, file_ext=None, summary=None):
+    """Load a prepared frame, using the on-disk cache when cache_key is given.
+    
+    columns projects the result to what a view needs. Cached files read
+    only those Parquet columns; a cache miss parses the full file once so
+    other views can be served from the cache later; without a cache key
+    only the projected source columns are parsed. With a summary spec a
+    cache miss also stores the file's summary (see PER-FILE SUMMARIES).
+    """
+    columns = resolve_projection(columns)
+    try:
+        file_ext = file_ext or get_file_ext(file_path)
+        if file_ext not in ('xlsx', 'xls', 'csv'):
+            return None, f"Format tidak didukung: {file_ext}"
+        
+        if cache_key:
+            cached = read_cached_frame(cache_key, columns=columns)
+            if cached is not None:
+                return cached, None
+            if file_ext == 'csv' and isinstance(file_path, str):
+                df = load_incremental_frame(file_path, cache_key, summary=summary)
+                if df is not None:
+                    return project_frame(df, columns), None
+        
+        source_columns = None if cache_key or columns is None else columns
+        df = read_raw_data(file_path, file_ext, source_columns)
+        df, error = prepare_data(df)
+        if error:
+            return None, error
+        
+        if cache_key:
+            write_cached_frame(cache_key, df)
+            if summary:
+                write_file_summary(cache_key, summary['build'](df))
+        return project_frame(df, columns), None
+    except Exception as e:
+        return None, f"Error: {str(e)}"
+
+# ===== PERSISTENT CACHE =====
+def compute_file_hash(file_path, chunk_size=1024 * 1024):
+    """SHA-256 of a file's content, read in chunks"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def compute_prefix_hashes(file_path, prefix_size, chunk_size=1024 * 1024):
+    """SHA-256 of the first prefix_size bytes and of the whole file, in one pass"""
+    digest = hashlib.sha256()
+    prefix_hash = None
+    remaining = prefix_size
+    with open(file_path, 'rb') as f:
+        while remaining > 0:
+            chunk = f.read(min(chunk_size, remaining))
+            if not chunk:
+                break
+            digest.update(chunk)
+            remaining -= len(chunk)
+        if remaining == 0:
+            prefix_hash = digest.hexdigest()
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return prefix_hash, digest.hexdigest()
+
+CACHE_LOCK_TIMEOUT = 10
+_cache_thread_lock = threading.RLock()
+_manifest_cache = {}
+
+@contextmanager
+def cache_lock(cache_folder=CACHE_FOLDER, timeout=CACHE_LOCK_TIMEOUT):
+    """Serialize read-modify-write updates of the cache manifest.
+    
+    A thread lock covers sessions in one process and an O_EXCL lock file
+    covers worker processes and other app instances. A lock file older
+    than timeout is treated as left behind by a crashed process.
+    """
+    lock_path = os.path.join(cache_folder, 'manifest.lock')
+    with _cache_thread_lock:
+        os.makedirs(cache_folder, exist_ok=True)
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                os.close(os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                break
+            except FileExistsError:
+                try:
+                    if time.time() - os.path.getmtime(lock_path) > timeout:
+                        os.remove(lock_path)
+                        continue
+                except OSError:
+                    continue
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f"Cache lock busy: {lock_path}")
+                time.sleep(0.05)
+        try:
+            yield
+        finally:
+            try:
+                os.remove(lock_path)
+            except OSError:
+                pass
+
+def _manifest_path(cache_folder=CACHE_FOLDER):
+    return os.path.join(cache_folder, 'manifest.json')
+
+def read_cache_manifest(cache_folder=CACHE_FOLDER):
+    """Parse the manifest from disk (call under cache_lock before updating it)"""
+    try:
+        with open(_manifest_path(cache_folder), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except:
+        return {}
+
+def load_cache_manifest(cache_folder=CACHE_FOLDER):
+    """Read-only view of the manifest, kept in memory and re-parsed only
+    when the file's mtime changes"""
+    try:
+        mtime = os.stat(_manifest_path(cache_folder)).st_mtime_ns
+    except OSError:
+        return {}
+    cached = _manifest_cache.get(cache_folder)
+    if cached is None or cached[0] != mtime:
+        cached = (mtime, read_cache_manifest(cache_folder))
+        _manifest_cache[cache_folder] = cached
+    return cached[1]
+
+def save_cache_manifest(manifest, cache_folder=CACHE_FOLDER):
+    """Write the manifest atomically (temp file + os.replace), under cache_lock"""
+    try:
+        os.makedirs(cache_folder, exist_ok=True)
+        path = _manifest_path(cache_folder)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_path, path)
+        _manifest_cache[cache_folder] = (os.stat(path).st_mtime_ns, manifest)
+    except:
+        pass
+
+def get_file_fingerprint(file_path, cache_folder=CACHE_FOLDER):
+    """Fingerprint a data file by path, size, mtime and content hash.
+    
+    The content hash is only recomputed when size or mtime differ from the
+    manifest entry, so an unchanged file costs a stat() of the file and of
+    the manifest; the manifest itself is only re-parsed after it changed.
+    """
+    stat = os.stat(file_path)
+    path = os.path.abspath(file_path)
+    entry = load_cache_manifest(cache_folder).get(path)
+    
+    if entry and entry.get('size') == stat.st_size and entry.get('mtime') == stat.st_mtime_ns:
+        content_hash = entry['sha256']
+    else:
+        append_from = None
+        if entry and path.lower().endswith('.csv') and stat.st_size > entry.get('size', 0):
+            prefix_hash, content_hash = compute_prefix_hashes(file_path, entry['size'])
+            if prefix_hash == entry['sha256']:
+                append_from = {'key': entry['key'], 'offset': entry['size']}
+                if not os.path.exists(_cached_frame_path(entry['key'], cache_folder)):
+                    append_from = entry.get('append_from')
+        else:
+            content_hash = compute_file_hash(file_path)
+        
+        # Hash outside the lock; re-read the manifest under it so concurrent
+        # sessions and workers never overwrite each other's entries
+        new_key = f"{content_hash}-v{CACHE_VERSION}"
+        with cache_lock(cache_folder):
+            manifest = read_cache_manifest(cache_folder)
+            stale_key = (manifest.get(path) or {}).get('key')
+            manifest[path] = {'size': stat.st_size, 'mtime': stat.st_mtime_ns,
+                              'sha256': content_hash, 'key': new_key}
+            if append_from:
+                manifest[path]['append_from'] = append_from
+            save_cache_manifest(manifest, cache_folder)
+            if stale_key and stale_key != new_key and not append_from:
+                _release_cached_frame(stale_key, manifest, path, cache_folder)
+    
+    return {
+        'path': path,
+        'size': stat.st_size,
+        'mtime': stat.st_mtime_ns,
+        'sha256': content_hash,
+        'key': f"{content_hash}-v{CACHE_VERSION}"
+    }
+
+def get_cache_key(file_path, cache_folder=CACHE_FOLDER):
+    """Cache key for a data file, or None if it cannot be fingerprinted"""
+    try:
+        return get_file_fingerprint(file_path, cache_folder)['key']
+    except:
+        return None
+
+def _cached_frame_path(cache_key, cache_folder=CACHE_FOLDER):
+    return os.path.join(cache_folder, f"{cache_key}.parquet")
+
+def _remove_cached_frame(cache_key, cache_folder=CACHE_FOLDER):
+    for path in [_cached_frame_path(cache_key, cache_folder)] + _summary_files(cache_key, cache_folder):
+        try:
+            os.remove(path)
+        except:
+            pass
+
+def _release_cached_frame(cache_key, manifest, owner_path, cache_folder=CACHE_FOLDER):
+    """Remove a cached frame unless another manifest entry still uses it"""
+    in_use = any(e.get('key') == cache_key or (e.get('append_from') or {}).get('key') == cache_key
+                 for p, e in manifest.items() if p != owner_path)
+    if not in_use:
+        _remove_cached_frame(cache_key, cache_folder)
+
+def read_cached_frame(cache_key, cache_folder=CACHE_FOLDER, columns=None):
+    """Return the prepared frame stored for cache_key, or None on a miss.
+    
+    With columns, only those Parquet columns are read from disk.
+    """
+    path = _cached_frame_path(cache_key, cache_folder)
+    if not os.path.exists(path):
+        return None
+    try:
+        if columns is not None:
+            import pyarrow.parquet as pq
+            available = set(pq.read_schema(path).names)
+            columns = [c for c in columns if c in available]
+        df = pd.read_parquet(path, columns=columns)
+        df = apply_column_schema(df, compile_column_schema(tuple(df.columns)))
+        return encode_dimensions(df)
+    except:
+        _remove_cached_frame(cache_key, cache_folder)
+        return None
+
+def write_cached_frame(cache_key, df, cache_folder=CACHE_FOLDER):
+    """Persist a prepared frame as Parquet (no-op if pyarrow is unavailable)"""
+    try:
+        os.makedirs(cache_folder, exist_ok=True)
+        path = _cached_frame_path(cache_key, cache_folder)
+        tmp_path = path + '.tmp'
+        df.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, path)
+        return True
+    except:
+        return False
+
+def purge_data_cache(cache_folder=CACHE_FOLDER):
+    """Delete every cached frame and summary and the manifest"""
+    removed = 0
+    if not os.path.isdir(cache_folder):
+        return removed
+    with cache_lock(cache_folder):
+        for name in os.listdir(cache_folder):
+            if name == 'manifest.lock':
+                continue
+            try:
+                os.remove(os.path.join(cache_folder, name))
+                removed += 1
+            except:
+                pass
+        _manifest_cache.pop(cache_folder, None)
+    return removed
+
+# ===== PER-FILE SUMMARIES =====
+# Small derived tables of a single file, persisted next to the cached frame
+# so later reads never touch the rows or the workbook again. What they hold
+# is given by a summary spec (the dashboard passes qos_analytics.FILE_SUMMARY):
+# 'build' maps a prepared frame to {part: table}, 'merge' combines several
+# such summaries, 'columns' is what build reads and 'parts' the stored tables
+SUMMARY_VERSION = 2
+
+def _summary_path(cache_key, part, cache_folder=CACHE_FOLDER):
+    return os.path.join(cache_folder, f"{cache_key}.{part}-v{SUMMARY_VERSION}.parquet")
+
+def _summary_files(cache_key, cache_folder=CACHE_FOLDER):
+    """Every stored summary part of cache_key, of any version"""
+    return glob.glob(os.path.join(glob.escape(cache_folder), f"{glob.escape(cache_key)}.*.parquet"))
+
+def read_file_summary(cache_key, summary, cache_folder=CACHE_FOLDER):
+    """Stored summary of cache_key, or None if a part is missing"""
+    try:
+        return {part: pd.read_parquet(_summary_path(cache_key, part, cache_folder)) for part in summary['parts']}
+    except:
+        return None
+
+def write_file_summary(cache_key, parts, cache_folder=CACHE_FOLDER):
+    try:
+        os.makedirs(cache_folder, exist_ok=True)
+        for part, table in parts.items():
+            path = _summary_path(cache_key, part, cache_folder)
+            table.to_parquet(path + '.tmp', index=False)
+            os.replace(path + '.tmp', path)
+    except:
+        pass
+
+def load_file_summary(file_path, summary, cache_key=None, cache_folder=CACHE_FOLDER):
+    """Per-file summary, built from the prepared frame on first use.
+    
+    Returns (parts, error). With a cache key the parts are stored in the
+    cache folder and later calls only read those small Parquet files.
+    """
+    parts = read_file_summary(cache_key, summary, cache_folder) if cache_key else None
+    if parts is not None:
+        return parts, None
+    
+    df, error = load_prepared_frame(file_path, cache_key, summary['columns'], summary=summary)
+    if error:
+        return None, error
+    # A cache miss above already stored the summary built from the full frame
+    parts = read_file_summary(cache_key, summary, cache_folder) if cache_key else None
+    if parts is None:
+        parts = summary['build'](df)
+        if cache_key:
+            write_file_summary(cache_key, parts, cache_folder)
+    return parts, None
+
+# ===== UPLOADS =====
+def hash_upload(uploaded, chunk_size=UPLOAD_CHUNK_SIZE):
+    """Cache key for an uploaded file object, hashed in chunks.
+    
+    Uses the same content-hash key as folder files, so a workbook that
+    was already loaded from 'data' (or uploaded before) hits the cache.
+    """
+    digest = hashlib.sha256()
+    _rewind(uploaded)
+    for chunk in iter(lambda: uploaded.read(chunk_size), b''):
+        digest.update(chunk)
+    _rewind(uploaded)
+    return f"{digest.hexdigest()}-v{CACHE_VERSION}"
+
+def spool_upload(uploaded, chunk_size=UPLOAD_CHUNK_SIZE):
+    """Copy an upload in chunks into a temp file that spills to disk when large"""
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_MEMORY)
+    _rewind(uploaded)
+    for chunk in iter(lambda: uploaded.read(chunk_size), b''):
+        spool.write(chunk)
+    _rewind(uploaded)
+    spool.seek(0)
+    return spool
+
+def load_uploaded_frame(uploaded, cache_key, columns=None):
+    """Load an uploaded file through the persistent cache, parsing from a spooled copy on a miss"""
+    cached = read_cached_frame(cache_key, columns=resolve_projection(columns))
+    if cached is not None:
+        return cached, None
+    with spool_upload(uploaded) as spool:
+        return load_prepared_frame(spool, cache_key, columns, file_ext=get_file_ext(uploaded))
+
+# ===== INCREMENTAL APPEND =====
+def read_appended_rows(file_path, offset):
+    """Parse only the CSV rows written after byte offset.
+    
+    Returns None when the old content did not end on a line boundary,
+    in which case the caller must re-parse the whole file.
+    """
+    with open(file_path, 'rb') as f:
+        f.seek(max(offset - 1, 0))
+        if f.read(1) != b'\n':
+            return None
+        tail = f.read()
+    
+    header = pd.read_csv(file_path, encoding='utf-8-sig', nrows=0).columns
+    if not tail.strip():
+        return pd.DataFrame(columns=header)
+    schema = compile_column_schema(tuple(header))
+    
+    def reader(**kw):
+        return pd.read_csv(BytesIO(tail), header=None, names=list(header), encoding='utf-8', **kw)
+    return parse_with_schema(reader, schema)
+
+def load_incremental_frame(file_path, cache_key, cache_folder=CACHE_FOLDER, summary=None):
+    """Build the frame for cache_key by appending new CSV rows to the cached base.
+    
+    Applies when get_file_fingerprint detected that the file only grew
+    (its previous content is an unchanged byte prefix). Returns None if
+    no usable base exists. With a summary spec the base's stored summary
+    is merged with one built from the new rows only; the filter index is
+    not additive and is still rebuilt from the extended frame.
+    """
+    path = os.path.abspath(file_path)
+    entry = load_cache_manifest(cache_folder).get(path)
+    if not entry or entry.get('key') != cache_key or not entry.get('append_from'):
+        return None
+    
+    base_info = entry['append_from']
+    base = read_cached_frame(base_info['key'], cache_folder)
+    if base is None:
+        return None
+    tail = read_appended_rows(file_path, base_info['offset'])
+    if tail is None:
+        return None
+    
+    tail, error = prepare_data(tail) if len(tail) else (None, 'empty')
+    if error:
+        df = base
+    else:
+        categories = shared_dimension_categories([base, tail])
+        df = pd.concat([encode_dimensions(base, categories), encode_dimensions(tail, categories)], ignore_index=True)
+        df = apply_column_schema(df, compile_column_schema(tuple(df.columns)))
+    
+    write_cached_frame(cache_key, df, cache_folder)
+    parts = read_file_summary(base_info['key'], summary, cache_folder) if summary else None
+    if parts is not None:
+        if not error:
+            parts = summary['merge'](parts, summary['build'](tail))
+        write_file_summary(cache_key, parts, cache_folder)
+    with cache_lock(cache_folder):
+        manifest = read_cache_manifest(cache_folder)
+        entry = manifest.get(path)
+        if entry and entry.get('key') == cache_key:
+            entry.pop('append_from', None)
+            save_cache_manifest(manifest, cache_folder)
+        _release_cached_frame(base_info['key'], manifest, path, cache_folder)
+    return df
+
+# ===== MULTI-FILE INGEST =====
+SOURCE_COLUMN = 'Source File'
+DEDUPE_KEYS = ['No.', 'Lokasi Pengukuran', 'Operator', 'Tanggal Pengukuran']
+
+def _load_file_worker(args):
+    file_path, cache_key, columns, summary = args
+    df, error = load_prepared_frame(file_path, cache_key, columns, summary=summary)
+    return file_path, df, error
+
+def parse_files_parallel(jobs, max_workers=None, columns=None, summary=None):
+    """Run (file_path, cache_key) load jobs in a process pool.
+    
+    Cached files are read in-process; only cache misses are shipped to
+    worker processes, which also store each file's summary when a summary
+    spec is given. Falls back to sequential loading if a pool cannot be
+    started.
+    """
+    results = {}
+    misses = []
+    projection = resolve_projection(columns)
+    for file_path, cache_key in jobs:
+        cached = read_cached_frame(cache_key, columns=projection) if cache_key else None
+        if cached is not None:
+            results[file_path] = (cached, None)
+        else:
+            misses.append((file_path, cache_key, columns, summary))
+    
+    workers = min(len(misses), max_workers or os.cpu_count() or 1)
+    if workers > 1:
+        try:
+            ctx = multiprocessing.get_context('spawn')
+            with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+                for file_path, df, error in pool.map(_load_file_worker, misses):
+                    results[file_path] = (df, error)
+            misses = []
+        except Exception:
+            pass
+    
+    for job in misses:
+        file_path, df, error = _load_file_worker(job)
+        results[file_path] = (df, error)
+    
+    return [(file_path, *results[file_path]) for file_path, _ in jobs]
+
+def merge_prepared_frames(frames):
+    """Concatenate tagged frames and drop overlapping measurement rows.
+    
+    Frames are expected newest-first; when the same measurement appears in
+    several files the row from the earliest frame in the list is kept.
+    """
+    categories = shared_dimension_categories(frames)
+    df = pd.concat([encode_dimensions(frame, categories) for frame in frames], ignore_index=True)
+    keys = [c for c in DEDUPE_KEYS if c in df.columns]
+    if keys:
+        df = df.drop_duplicates(subset=keys, keep='first')
+    df = apply_column_schema(df, compile_column_schema(tuple(df.columns)))
+    if SOURCE_COLUMN in df.columns:
+        df[SOURCE_COLUMN] = df[SOURCE_COLUMN].astype('category')
+    return df.reset_index(drop=True)
+
+def load_multiple_files(file_paths, cache_keys=None, max_workers=None, columns=None, summary=None):
+    """Load several data files concurrently into one unified frame.
+    
+    Returns (df, errors) where errors lists per-file problems; df is None
+    only if no file could be loaded. With a summary spec, parsed files get
+    their per-file summary stored so the caller can merge those instead of
+    aggregating the merged rows again.
+    """
+    cache_keys = cache_keys or [None] * len(file_paths)
+    frames = []
+    errors = []
+    for file_path, df, error in parse_files_parallel(list(zip(file_paths, cache_keys)), max_workers, columns, summary):
+        if error:
+            errors.append(f"{os.path.basename(file_path)}: {error}")
+            continue
+        frames.append(df.assign(**{SOURCE_COLUMN: os.path.basename(file_path)}))
+    
+    if not frames:
+        return None, errors or ["Tidak ada file yang dipilih"]
+    return merge_prepared_frames(frames), errors
+
+# ===== EXPORT =====
+EXPORT_FORMATS = {
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    'csv': 'text/csv',
+    'parquet': 'application/vnd.apache.parquet'
+}
+EXPORT_CHUNK_ROWS = 10000
+
+def _xlsx_bytes(df, sheet_name='Data'):
+    """Workbook streamed row by row through openpyxl's write-only mode"""
+    from openpyxl import Workbook
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(sheet_name)
+    sheet.append([str(col) for col in df.columns])
+    for start in range(0, len(df), EXPORT_CHUNK_ROWS):
+        chunk = df.iloc[start:start + EXPORT_CHUNK_ROWS].astype(object)
+        for row in chunk.where(chunk.notna(), None).itertuples(index=False, name=None):
+            sheet.append(row)
+    output = BytesIO()
+    workbook.save(output)
+    return output.getvalue()
+
+def export_frame(df, file_format):
+    """File contents of a frame in one of EXPORT_FORMATS"""
+    if file_format == 'xlsx':
+        return _xlsx_bytes(df)
+    if file_format == 'csv':
+        return df.to_csv(index=False).encode('utf-8')
+    if file_format == 'parquet':
+        output = BytesIO()
+        df.to_parquet(output, index=False)
+        return output.getvalue()
+    raise ValueError(f"Format tidak didukung: {file_format}")